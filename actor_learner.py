@@ -0,0 +1,153 @@
+# actor_learner.py
+
+import copy
+import threading
+import time
+import numpy as np
+import torch
+from ai_env import ACT_MAP
+from vec_env import VecHiderHunterEnv
+
+class ActorLearner:
+    """
+    Concurrent training of a hider and a hunter DQNAgent. Actor threads
+    each step a VecHiderHunterEnv with their own copy of the policies and
+    write transitions into the agents' replay buffers; the learner (the
+    thread calling run()) keeps calling DQNAgent.update so that the number
+    of updates tracks update_to_data * transitions collected. Actors wait
+    on a condition whenever they get more than slack updates ahead of the
+    learner (default: one round of steps from every actor), so the ratio
+    holds however slow the updates are.
+
+    Epsilon follows the total env steps across all actors, so it decays at
+    the same rate per transition as the serial loop. Target sync still
+    counts learner updates (DQNAgent.sync_every). Actors pick up new
+    weights whenever the learner publishes them, every publish_every updates.
+    """
+    def __init__(self, hider, hunter, n_actors=2, envs_per_actor=16, update_to_data=0.25,
+                 publish_every=50, seed=0, slack=None, **env_kwargs):
+        self.agents = (hider, hunter)
+        self.n_actors = n_actors
+        self.envs_per_actor = envs_per_actor
+        self.update_to_data = update_to_data
+        self.publish_every = publish_every
+        if slack is None:
+            slack = n_actors * envs_per_actor * update_to_data
+        self.slack = slack
+        self.seed = seed
+        self.env_kwargs = env_kwargs
+        self.n_actions = len(ACT_MAP)
+
+        self.env_steps = 0         # Transitions per agent, summed over actors
+        self.updates = 0
+        self.episodes = 0
+        self.returns = []          # (hider, hunter) return of every finished episode
+        self._stats_lock = threading.Lock()
+        self._budget = threading.Condition()   # Actors wait here for the learner
+        self._stop = threading.Event()
+        self._errors = []
+        self._start_steps = 0
+        self._publish()
+
+    def _publish(self):
+        """Snapshot the learner weights; actors swap them in on their next step."""
+        weights = tuple({k: v.detach().cpu().clone() for k, v in agent.policy.state_dict().items()}
+                        for agent in self.agents)
+        self._weights = (self.updates, weights)
+
+    def _act(self, policy, obs, eps, rng):
+        actions = rng.integers(self.n_actions, size=len(obs))
+        greedy = rng.random(len(obs)) >= eps
+        if greedy.any():
+            with torch.inference_mode():
+                q = policy(torch.from_numpy(obs[greedy].astype(np.float32)))
+            actions[greedy] = q.argmax(1).numpy()
+        return actions
+
+    def _actor(self, rank):
+        try:
+            rng = np.random.default_rng(self.seed + rank)
+            env = VecHiderHunterEnv(self.envs_per_actor, seed=self.seed + rank, **self.env_kwargs)
+            # Actors run on the CPU whatever device the learner uses.
+            policies = [copy.deepcopy(agent.policy).cpu().eval() for agent in self.agents]
+            version = None
+            obs = env.reset()
+            ep_return = np.zeros((self.envs_per_actor, 2))
+            while not self._stop.is_set():
+                with self._budget:
+                    while self._ahead() and not self._stop.is_set():
+                        self._budget.wait(0.1)
+                if self._weights[0] != version:
+                    version, weights = self._weights
+                    for policy, state in zip(policies, weights):
+                        policy.load_state_dict(state)
+                actions = [self._act(policy, o, agent.epsilon(self.env_steps), rng)
+                           for policy, o, agent in zip(policies, obs, self.agents)]
+                next_obs, rewards, done, final_obs = env.step(*actions)
+                for agent, o, a, r, f in zip(self.agents, obs, actions, rewards, final_obs):
+                    agent.remember_batch(o, a, r, f, done.astype(np.float32))
+                ep_return += np.stack(rewards, axis=1)
+                with self._stats_lock:
+                    self.env_steps += self.envs_per_actor
+                    if done.any():
+                        self.episodes += int(done.sum())
+                        self.returns.extend(map(tuple, ep_return[done]))
+                ep_return[done] = 0
+                obs = next_obs
+        except Exception as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _ahead(self):
+        """True while the actors are more than slack updates ahead of the learner."""
+        if any(len(agent.memory) < agent.batch_size for agent in self.agents):
+            return False  # The learner cannot update before the buffers fill
+        return self.update_to_data * self.env_steps > self.updates + self.slack
+
+    def _learn_step(self):
+        """One update per agent if the update-to-data budget allows; False if not."""
+        if self.updates >= self.update_to_data * self.env_steps:
+            return False
+        stepped = [agent.update() for agent in self.agents]
+        if not any(stepped):
+            return False  # Buffers still below batch_size
+        with self._budget:
+            self.updates += 1
+            self._budget.notify_all()
+        if self.updates % self.publish_every == 0:
+            self._publish()
+        return True
+
+    def run(self, total_env_steps, log_every=10.0):
+        """Train until the actors have collected total_env_steps transitions per agent."""
+        self._stop.clear()
+        actors = [threading.Thread(target=self._actor, args=(rank,), daemon=True)
+                  for rank in range(self.n_actors)]
+        for t in actors:
+            t.start()
+        start = last_log = time.time()
+        self._start_steps = self.env_steps
+        try:
+            while self.env_steps < total_env_steps and not self._stop.is_set():
+                if not self._learn_step():
+                    time.sleep(0.0005)  # Waiting for data; let the actors run
+                if log_every and time.time() - last_log >= log_every:
+                    last_log = time.time()
+                    print(self.progress(time.time() - start))
+        finally:
+            self._stop.set()
+            with self._budget:
+                self._budget.notify_all()
+            for t in actors:
+                t.join()
+        if self._errors:
+            raise self._errors[0]
+        self._publish()
+        return self.progress(time.time() - start)
+
+    def progress(self, elapsed):
+        recent = np.array(self.returns[-100:]) if self.returns else np.zeros((1, 2))
+        return (f"[ActorLearner] steps={self.env_steps} updates={self.updates} episodes={self.episodes} "
+                f"steps/s={(self.env_steps - self._start_steps) / max(elapsed, 1e-9):.0f} "
+                f"hider={recent[:, 0].mean():.1f} hunter={recent[:, 1].mean():.1f} "
+                f"eps={self.agents[0].epsilon(self.env_steps):.3f}")
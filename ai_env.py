@@ -4,13 +4,35 @@ import math
 from player import Player
 from settings import *
 from map import Map
-from raycaster import raycast_2d
+from raycaster import raycast_batch, raycast_many
 from sprite_object import SpriteObject
 from fake_player import FakePlayer
+from maze_pool import MazePool
+
+# (forward, strafe, rotate) per discrete action
+ACT_MAP = [
+    (1, 0, 0),   # move forward
+    (-1, 0, 0),  # move backward
+    (0, -1, 0),  # strafe left
+    (0, 1, 0),   # strafe right
+    (0, 0, -1),  # turn left
+    (0, 0, 1),   # turn right
+    (0, 0, 0),   # stay
+]
+AGENT_MOVE_SPEED = 2.5
+MOVE_DT = 0.20
+TURN_DT = 0.15
+CATCH_FACTOR = 0.92
 
 class HiderHunterEnv:
-    def __init__(self, map_width=15, map_height=15, num_rays=15, max_steps=300):
-        self.map = Map(map_width, map_height)
+    def __init__(self, map_width=15, map_height=15, num_rays=15, max_steps=300, maze_pool=MAZE_POOL_FILE):
+        # With a maze pool (MazePool or pool file path) every reset() draws a
+        # new maze from it and map_width/map_height are ignored.
+        if isinstance(maze_pool, str):
+            maze_pool = MazePool(maze_pool)
+        self.maze_pool = maze_pool
+        self.maze_index = -1  # Pool entry of the current map, -1 without a pool
+        self.map = Map(map_width, map_height) if maze_pool is None else None
         self.num_rays = num_rays
         self.max_steps = max_steps
         self.reset()
@@ -19,6 +41,10 @@ class HiderHunterEnv:
         return self.map.find_random_empty(avoid=avoid)
 
     def reset(self):
+        if self.maze_pool is not None:
+            # Same draw as maze_pool.sample_map(), but keeps the index for logs
+            self.maze_index = random.randrange(len(self.maze_pool))
+            self.map = self.maze_pool.get_map(self.maze_index)
         # random pick reset_default or reset_near_by
         return self.reset_hunter()
         if random.random() < 0.5:
@@ -50,12 +76,17 @@ class HiderHunterEnv:
 
         angle1 = random.uniform(0, 2*math.pi)
         angle2 = random.uniform(0, 2*math.pi)
-        self.hider = Player(h_x, h_y, angle1, PLAYER_RADIUS, 2.5, PLAYER_ROT_SPEED)
-        self.hunter = Player(t_x, t_y, angle2, PLAYER_RADIUS, 2.5, PLAYER_ROT_SPEED)
+        self.hider = Player(h_x, h_y, angle1, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
+        self.hunter = Player(t_x, t_y, angle2, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
+        self.steps = 0
+        return self._get_obs_pair()
+    def reset_to(self, game_map, hider_pose, hunter_pose):
+        """Start an episode on game_map from given (x, y, angle) poses, e.g. to replay a logged game."""
+        self.map = game_map
+        self.hider = Player(*hider_pose, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
+        self.hunter = Player(*hunter_pose, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
         self.steps = 0
-        obs_hider = self._get_obs(self.hider, self.hunter)
-        obs_hunter = self._get_obs(self.hunter, self.hider)
-        return obs_hider, obs_hunter
+        return self._get_obs_pair()
     def reset_default(self):
         avoid = set()
         h_x, h_y = self._rand_free_pos()
@@ -63,12 +94,10 @@ class HiderHunterEnv:
         t_x, t_y = self._rand_free_pos(avoid=avoid)
         angle1 = random.uniform(0, 2*math.pi)
         angle2 = random.uniform(0, 2*math.pi)
-        self.hider = Player(h_x, h_y, angle1, PLAYER_RADIUS, 2.5, PLAYER_ROT_SPEED)
-        self.hunter = Player(t_x, t_y, angle2, PLAYER_RADIUS, 2.5, PLAYER_ROT_SPEED)
+        self.hider = Player(h_x, h_y, angle1, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
+        self.hunter = Player(t_x, t_y, angle2, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
         self.steps = 0
-        obs_hider = self._get_obs(self.hider, self.hunter)
-        obs_hunter = self._get_obs(self.hunter, self.hider)
-        return obs_hider, obs_hunter
+        return self._get_obs_pair()
     
     def reset_near_by(self):
         avoid = set()
@@ -95,27 +124,19 @@ class HiderHunterEnv:
 
         angle1 = random.uniform(0, 2*math.pi)
         angle2 = random.uniform(0, 2*math.pi)
-        self.hider = Player(h_x, h_y, angle1, PLAYER_RADIUS, 2.5, PLAYER_ROT_SPEED)
-        self.hunter = Player(t_x, t_y, angle2, PLAYER_RADIUS, 2.5, PLAYER_ROT_SPEED)
+        self.hider = Player(h_x, h_y, angle1, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
+        self.hunter = Player(t_x, t_y, angle2, PLAYER_RADIUS, AGENT_MOVE_SPEED, PLAYER_ROT_SPEED)
         self.steps = 0
-        obs_hider = self._get_obs(self.hider, self.hunter)
-        obs_hunter = self._get_obs(self.hunter, self.hider)
-        return obs_hider, obs_hunter
+        return self._get_obs_pair()
 
     def _get_obs(self, me, other):
         assert hasattr(me, 'angle') and hasattr(other, 'angle'), f"me:{type(me)}, other:{type(other)}"
         # [distance to wall per ray, distance to other per ray]
-        rays = raycast_2d(me.x, me.y, me.angle, PLAYER_FOV, self.num_rays, self.map, [other])
-        wall = np.array([min(ray['distance'], RAY_MAX_DISTANCE)/RAY_MAX_DISTANCE for ray in rays])
+        rays = raycast_batch(me.x, me.y, me.angle, PLAYER_FOV, self.num_rays, self.map, [other])
+        wall = np.minimum(rays['distance'], RAY_MAX_DISTANCE) / RAY_MAX_DISTANCE
         # for "visible" others, use normalized distance, else 1.0
-        other_hits = []
-        for ray in rays:
-            if ray['object_hit'] is other:
-                val = min(ray['object_hit_distance'], RAY_MAX_DISTANCE)/RAY_MAX_DISTANCE
-            else:
-                val = 1.0
-            other_hits.append(val)
-        other_arr = np.array(other_hits)
+        other_arr = np.where(rays['object_index'] == 0,
+                             np.minimum(rays['object_distance'], RAY_MAX_DISTANCE) / RAY_MAX_DISTANCE, 1.0)
         ang = np.array([
             math.cos(me.angle),
             math.sin(me.angle),
@@ -125,28 +146,39 @@ class HiderHunterEnv:
         vel = np.zeros(2)   # Placeholder for velocity if you want to add it
         return np.concatenate([wall, other_arr, ang, vel])
 
+    def _get_obs_pair(self):
+        """Observations for (hider, hunter) from a single batched raycast."""
+        agents = [self.hider, self.hunter]
+        poses = [(a.x, a.y, a.angle) for a in agents]
+        # Both agents are objects; each viewer ignores its own body.
+        rays = raycast_many(poses, PLAYER_FOV, self.num_rays, self.map, agents, ignore=[0, 1])
+        self._last_rays = rays
+        wall = np.minimum(rays['distance'], RAY_MAX_DISTANCE) / RAY_MAX_DISTANCE
+        other_idx = np.array([[1], [0]])
+        other_arr = np.where(rays['object_index'] == other_idx,
+                             np.minimum(rays['object_distance'], RAY_MAX_DISTANCE) / RAY_MAX_DISTANCE, 1.0)
+        cos_sin = np.array([[math.cos(a.angle), math.sin(a.angle)] for a in agents])
+        ang = np.concatenate([cos_sin, cos_sin[::-1]], axis=1)
+        vel = np.zeros((2, 2))   # Placeholder for velocity if you want to add it
+        obs = np.concatenate([wall, other_arr, ang, vel], axis=1)
+        return obs[0], obs[1]
+
+    def hunter_sees_hider(self):
+        return self.map.can_see(self.hunter.x, self.hunter.y, self.hider.x, self.hider.y)
+
     def step(self, action_hider, action_hunter):
         reward_hider = 0
         reward_hunter = 0
-        act_map = [
-            (1, 0, 0),   # move forward
-            (-1, 0, 0),  # move backward
-            (0, -1, 0),  # strafe left
-            (0, 1, 0),   # strafe right
-            (0, 0, -1),  # turn left
-            (0, 0, 1),   # turn right
-            (0, 0, 0),   # stay
-        ]
         for act, agent in zip([action_hider, action_hunter], [self.hider, self.hunter]):
-            fwd, strafe, rot = act_map[act]
-            agent.move(fwd, strafe, self.map, dt=0.20)
-            agent.rotate(rot, dt=0.15)
+            fwd, strafe, rot = ACT_MAP[act]
+            agent.move(fwd, strafe, self.map, dt=MOVE_DT)
+            agent.rotate(rot, dt=TURN_DT)
         self.steps += 1
 
         # Reward structure
         done = False
         dist = math.hypot(self.hider.x - self.hunter.x, self.hider.y - self.hunter.y)
-        caught = dist < (self.hider.radius + self.hunter.radius) * 0.92
+        caught = dist < (self.hider.radius + self.hunter.radius) * CATCH_FACTOR
         if caught:
             reward_hider = -20
             reward_hunter = +20
@@ -164,15 +196,14 @@ class HiderHunterEnv:
             reward_hunter = -1
 
         # Always use Players! Never obs vectors!
-        obs_hider = self._get_obs(self.hider, self.hunter)
-        obs_hunter = self._get_obs(self.hunter, self.hider)
-        return (obs_hider, obs_hunter), (reward_hider, reward_hunter), done
+        return self._get_obs_pair(), (reward_hider, reward_hunter), done
 
     def render(self, renderer, font, fps=None, extra=None):
         hunter_fake = FakePlayer(self.hunter.x, self.hunter.y, self.map, COLOR_FAKE_PLAYER, self.hunter.radius)
-        rays_h = raycast_2d(self.hider.x, self.hider.y, self.hider.angle, PLAYER_FOV, self.num_rays, self.map, [self.hunter])
-        rays_t = raycast_2d(self.hunter.x, self.hunter.y, self.hunter.angle, PLAYER_FOV, self.num_rays, self.map, [self.hider])
-        renderer.draw_2d_view(self.map, self.hider, rays_h, [], hunter_fake, font, 0, fps or 0, show_full_map=True)
+        # Reuse the hider's rays from the last step/reset instead of recasting.
+        rays_h = {k: v[0] for k, v in self._last_rays.items()}
+        renderer.draw_2d_view(self.map, self.hider, rays_h, [], [hunter_fake], font, 0, fps or 0,
+                              show_full_map=True, objects=[self.hider, self.hunter])
         rect = renderer.surface.get_rect()
         if extra:
             for i, txt in enumerate(extra.split("\n")):
@@ -1,9 +1,20 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
+import threading
 import numpy as np
-import random
-from collections import deque
+from replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from settings import TORCH_DEVICE, REPLAY_PRIORITIZED, PER_ALPHA, PER_BETA_START, PER_BETA_STEPS
+
+def select_device(name=TORCH_DEVICE):
+    """torch.device for name; 'auto' picks cuda, then mps, then cpu."""
+    if name != 'auto':
+        return torch.device(name)
+    if torch.cuda.is_available():
+        return torch.device('cuda')
+    if torch.backends.mps.is_available():
+        return torch.device('mps')
+    return torch.device('cpu')
 
 class MLP(nn.Module):
     def __init__(self, input_dim, output_dim):
@@ -19,20 +30,27 @@ class MLP(nn.Module):
         return self.net(x)
 
 class DQNAgent:
-    def __init__(self, input_dim, output_dim, lr=1e-3, gamma=0.96):
-        self.device = torch.device('mps')
+    def __init__(self, input_dim, output_dim, lr=1e-3, gamma=0.96, prioritized=REPLAY_PRIORITIZED, device=None):
+        self.device = select_device(device or TORCH_DEVICE)
         self.policy = MLP(input_dim, output_dim).to(self.device)
         self.target = MLP(input_dim, output_dim).to(self.device)
         self.target.load_state_dict(self.policy.state_dict())
         self.optimizer = optim.Adam(self.policy.parameters(), lr=lr)
         self.gamma = gamma
-        self.memory = deque(maxlen=40000)
+        self.prioritized = prioritized
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(40000, input_dim, alpha=PER_ALPHA)
+        else:
+            self.memory = ReplayBuffer(40000, input_dim)
         self.batch_size = 96
         self.steps = 0
         self.sync_every = 128
         self.eps_min = 0.01
         self.eps_max = 0.9
         self.eps_decay = 7000
+        self._select_buf = None
+        # Guards self.memory when actor threads write while update() samples.
+        self.memory_lock = threading.Lock()
 
     def select(self, obs, act_space):
         if np.random.rand() < self.epsilon():
@@ -42,31 +60,74 @@ class DQNAgent:
             q = self.policy(obs)
             return int(torch.argmax(q).item())
 
-    def epsilon(self):
-        return max(self.eps_min, self.eps_max - self.steps / self.eps_decay)
+    def select_batch(self, obs, act_space):
+        """Epsilon-greedy actions for a (N, input_dim) array of observations, one forward pass."""
+        obs = np.asarray(obs, dtype=np.float32)
+        n = obs.shape[0]
+        explore = np.random.rand(n) < self.epsilon()
+        actions = np.random.randint(act_space, size=n)
+        if explore.all():
+            return actions
+        if self._select_buf is None or self._select_buf.shape != obs.shape:
+            # Page-locked staging memory makes the host-to-device copy async on CUDA.
+            self._select_buf = torch.empty(obs.shape, dtype=torch.float32,
+                                           pin_memory=self.device.type == 'cuda')
+        self._select_buf.numpy()[:] = obs
+        with torch.inference_mode():
+            q = self.policy(self._select_buf.to(self.device, non_blocking=True))
+            greedy = q.argmax(1).cpu().numpy()
+        return np.where(explore, actions, greedy)
+
+    def epsilon(self, steps=None):
+        """Exploration rate after steps (default: own update count, one per env step when serial)."""
+        if steps is None:
+            steps = self.steps
+        return max(self.eps_min, self.eps_max - steps / self.eps_decay)
 
     def remember(self, obs, act, rew, next_obs, done):
-        self.memory.append((obs, act, rew, next_obs, done))
+        with self.memory_lock:
+            self.memory.add(obs, act, rew, next_obs, done)
+
+    def remember_batch(self, obs, act, rew, next_obs, done):
+        """Store a batch of transitions, e.g. one per env of a VecHiderHunterEnv."""
+        with self.memory_lock:
+            self.memory.add_batch(obs, act, rew, next_obs, done)
 
     def update(self):
-        if len(self.memory) < self.batch_size:
-            return
-        batch = random.sample(self.memory, k=self.batch_size)
-        obs, act, rew, next_obs, done = zip(*batch)
-        obs = torch.tensor(np.array(obs), dtype=torch.float32, device=self.device)
-        next_obs = torch.tensor(np.array(next_obs), dtype=torch.float32, device=self.device)
-        act = torch.tensor(act, dtype=torch.long, device=self.device).unsqueeze(1)
-        rew = torch.tensor(rew, dtype=torch.float32, device=self.device).unsqueeze(1)
-        done = torch.tensor(done, dtype=torch.float32, device=self.device).unsqueeze(1)
+        if self.prioritized:
+            beta = min(1.0, PER_BETA_START + (1.0 - PER_BETA_START) * self.steps / PER_BETA_STEPS)
+        with self.memory_lock:
+            if len(self.memory) < self.batch_size:
+                return False
+            idx = self.memory.sample_indices(self.batch_size)
+            obs, act, rew, next_obs, done = self.memory.gather(idx)
+            if self.prioritized:
+                # Weights and slot versions from the same tree state as the sample
+                is_weights = self.memory.weights(idx, beta)
+                writes = self.memory.writes[idx]
+        # The gathered arrays are fresh copies, so wrap them without copying again.
+        obs = torch.from_numpy(obs).to(self.device)
+        next_obs = torch.from_numpy(next_obs).to(self.device)
+        act = torch.from_numpy(act).to(self.device).unsqueeze(1)
+        rew = torch.from_numpy(rew).to(self.device).unsqueeze(1)
+        done = torch.from_numpy(done).to(self.device).unsqueeze(1)
 
         q = self.policy(obs).gather(1, act)
         with torch.no_grad():
             tgt = self.target(next_obs).max(1)[0].unsqueeze(1)
             target_q = rew + self.gamma * tgt * (1 - done)
-        loss = nn.functional.mse_loss(q, target_q)
+        if self.prioritized:
+            weights = torch.from_numpy(is_weights).to(self.device).unsqueeze(1)
+            td_error = target_q - q
+            loss = (weights * td_error.pow(2)).mean()
+            with self.memory_lock:
+                self.memory.update_priorities(idx, td_error.detach().squeeze(1).cpu().numpy(), writes)
+        else:
+            loss = nn.functional.mse_loss(q, target_q)
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
         self.steps += 1
         if self.steps % self.sync_every == 0:
-            self.target.load_state_dict(self.policy.state_dict())
\ No newline at end of file
+            self.target.load_state_dict(self.policy.state_dict())
+        return True
\ No newline at end of file
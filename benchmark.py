@@ -0,0 +1,187 @@
+# benchmark.py
+#
+# Reproducible throughput benchmarks. Every case reseeds random/numpy/torch
+# and builds its own maze, so numbers are comparable between commits:
+#
+#   python benchmark.py --out bench_before.json
+#   python benchmark.py --out bench_after.json
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import numpy as np
+
+import raycaster
+from map import Map
+from sprite_object import SpriteObject
+from settings import PLAYER_FOV, NUM_RAYS, RAY_STEP_SIZE, RAY_ENGINE
+
+SEED = 1234
+
+def seed_all(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        import torch
+        torch.manual_seed(seed)
+    except ImportError:
+        pass
+
+def timeit(fn, min_time=0.5, repeats=3):
+    """Best-of-repeats calls/sec, each repeat running for at least min_time seconds."""
+    fn()  # warm up
+    best = 0.0
+    for _ in range(repeats):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, calls / elapsed)
+    return best
+
+def bench_raycast(map_size, num_rays, step_size, num_objects, engine, min_time):
+    seed_all()
+    game_map = Map(map_size, map_size)
+    objects = [SpriteObject(*game_map.find_random_empty(), None) for _ in range(num_objects)]
+    poses = []
+    for _ in range(64):
+        x, y = game_map.find_random_empty()
+        poses.append((x, y, random.uniform(0, 2 * np.pi)))
+    state = {'i': 0}
+
+    def run():
+        x, y, a = poses[state['i'] % len(poses)]
+        state['i'] += 1
+        raycaster.raycast_2d(x, y, a, PLAYER_FOV, num_rays, game_map, objects)
+
+    # The raycaster reads these module globals on every call.
+    saved = raycaster.RAY_STEP_SIZE, raycaster.RAY_ENGINE
+    raycaster.RAY_STEP_SIZE, raycaster.RAY_ENGINE = step_size, engine
+    try:
+        calls = timeit(run, min_time)
+    finally:
+        raycaster.RAY_STEP_SIZE, raycaster.RAY_ENGINE = saved
+    return calls * num_rays
+
+def bench_ai_env(map_size, num_rays, min_time):
+    from ai_env import HiderHunterEnv
+    seed_all()
+    env = HiderHunterEnv(map_width=map_size, map_height=map_size, num_rays=num_rays)
+    actions = np.random.randint(7, size=(4096, 2))
+    state = {'i': 0}
+
+    def run():
+        a_h, a_t = actions[state['i'] % len(actions)]
+        state['i'] += 1
+        _, _, done = env.step(int(a_h), int(a_t))
+        if done:
+            env.reset()
+    return timeit(run, min_time)
+
+def bench_maze_env(map_size, min_time):
+    from maze_env import HiderHunterEnv
+    seed_all()
+    maze = Map(map_size, map_size).occupancy.astype(np.int8)
+    env = HiderHunterEnv(maze)
+    actions = np.random.randint(8, size=(4096, 2))
+    state = {'i': 0}
+
+    def run():
+        a_h, a_t = actions[state['i'] % len(actions)]
+        state['i'] += 1
+        _, _, _, done = env.step(int(a_h), int(a_t))
+        if done:
+            env.reset()
+    return timeit(run, min_time)
+
+def bench_dqn_update(input_dim, min_time):
+    from ai_models import DQNAgent
+    seed_all()
+    agent = DQNAgent(input_dim, 7)
+    for _ in range(agent.batch_size * 4):
+        obs = np.random.rand(input_dim).astype(np.float32)
+        nxt = np.random.rand(input_dim).astype(np.float32)
+        agent.remember(obs, np.random.randint(7), np.random.randn(), nxt, float(np.random.rand() < 0.05))
+    return timeit(agent.update, min_time)
+
+def run_case(results, bench, params, unit, fn):
+    record = {'bench': bench, 'params': params, 'unit': unit}
+    try:
+        record['value'] = fn()
+        print(f"{bench:<14} {json.dumps(params):<80} {record['value']:>14.1f} {unit}")
+    except Exception as e:  # keep going, a broken case is a result too
+        record['value'] = None
+        record['error'] = f'{type(e).__name__}: {e}'
+        print(f"{bench:<14} {json.dumps(params):<80} ERROR {record['error']}")
+    results.append(record)
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Raycaster / env / training throughput benchmarks')
+    parser.add_argument('--out', default='bench_results.json', help='JSON file to write')
+    parser.add_argument('--quick', action='store_true', help='small sweep with short timings')
+    parser.add_argument('--min-time', type=float, default=None, help='seconds per timing repeat')
+    args = parser.parse_args()
+
+    min_time = args.min_time or (0.1 if args.quick else 0.5)
+    if args.quick:
+        map_sizes, ray_counts, step_sizes, object_counts = [13], [NUM_RAYS], [RAY_STEP_SIZE], [0, 100]
+    else:
+        map_sizes = [13, 25, 51]
+        ray_counts = [15, 45, 180]
+        step_sizes = [0.02, 0.05]
+        object_counts = [0, 10, 100, 1000]
+
+    results = []
+    for engine in ('step', 'dda', 'sphere'):
+        for size in map_sizes:
+            for rays in ray_counts:
+                # Step size only matters for the legacy marcher.
+                for step in (step_sizes if engine == 'step' else [RAY_STEP_SIZE]):
+                    for objs in object_counts:
+                        params = {'engine': engine, 'map_size': size, 'num_rays': rays,
+                                  'step_size': step, 'num_objects': objs}
+                        run_case(results, 'raycast_2d', params, 'rays/s',
+                                 lambda: bench_raycast(size, rays, step, objs, engine, min_time))
+    for size in map_sizes:
+        for rays in ray_counts:
+            run_case(results, 'ai_env.step', {'map_size': size, 'num_rays': rays}, 'steps/s',
+                     lambda: bench_ai_env(size, rays, min_time))
+        run_case(results, 'maze_env.step', {'map_size': size}, 'steps/s',
+                 lambda: bench_maze_env(size, min_time))
+    for rays in ray_counts:
+        input_dim = 2 * rays + 6  # layout of ai_env.HiderHunterEnv._get_obs
+        run_case(results, 'dqn.update', {'input_dim': input_dim}, 'updates/s',
+                 lambda: bench_dqn_update(input_dim, min_time))
+
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': SEED,
+            'default_engine': RAY_ENGINE,
+            'min_time': min_time,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'Wrote {len(results)} results to {args.out}')
+
+if __name__ == "__main__":
+    main()
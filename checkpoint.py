@@ -0,0 +1,102 @@
+# checkpoint.py
+
+import copy
+import os
+import queue
+import threading
+import torch
+
+def _cpu_clone(obj):
+    """Deep copy with every tensor detached onto the CPU, safe to save while training goes on."""
+    if torch.is_tensor(obj):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {k: _cpu_clone(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_cpu_clone(v) for v in obj)
+    return copy.deepcopy(obj)
+
+def agent_state(agent, include_memory=False):
+    """Snapshot of everything needed to resume a DQNAgent."""
+    state = {
+        'policy': _cpu_clone(agent.policy.state_dict()),
+        'target': _cpu_clone(agent.target.state_dict()),
+        'optimizer': _cpu_clone(agent.optimizer.state_dict()),
+        'steps': agent.steps,
+        'epsilon': agent.epsilon(),
+    }
+    if include_memory:
+        with agent.memory_lock:
+            state['memory'] = agent.memory.state_dict()
+    return state
+
+def load_agent_state(agent, state):
+    agent.policy.load_state_dict(state['policy'])
+    agent.target.load_state_dict(state['target'])
+    agent.optimizer.load_state_dict(state['optimizer'])
+    agent.steps = state['steps']
+    if 'memory' in state:
+        with agent.memory_lock:
+            agent.memory.load_state_dict(state['memory'])
+
+def atomic_save(obj, path):
+    """torch.save to a temp file next to path, then rename over it."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_checkpoint(path, map_location='cpu'):
+    # Checkpoints hold numpy arrays and counters next to the tensors.
+    return torch.load(path, map_location=map_location, weights_only=False)
+
+class AsyncCheckpointer:
+    """
+    Writes checkpoints on a background thread. save() only snapshots the
+    state on the caller's thread; serialization and disk I/O happen in the
+    writer. If a save is still pending when the next one arrives, the older
+    one is dropped, so a slow disk never stalls training.
+    """
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.saved = 0
+        self.error = None
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            try:
+                for obj, path in job:
+                    atomic_save(obj, path)
+                self.saved += 1
+            except Exception as e:  # reported on the next save() or close()
+                self.error = e
+            self._queue.task_done()
+
+    def save(self, *items):
+        """Queue (obj, path) pairs to be written together."""
+        if self.error is not None:
+            raise self.error
+        try:
+            self._queue.get_nowait()   # Drop a stale pending checkpoint
+            self._queue.task_done()
+        except queue.Empty:
+            pass
+        self._queue.put(list(items))
+
+    def wait(self):
+        self._queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.wait()
+        self._queue.put(None)
+        self._thread.join()
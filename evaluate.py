@@ -0,0 +1,141 @@
+# evaluate.py
+#
+# Headless evaluation of hider/hunter policies. Plays fixed-seed episodes
+# of ai_env.HiderHunterEnv across a process pool with greedy actions:
+#
+#   python evaluate.py --hider hider_dqn.pth --hunter hunter_dqn.pth --episodes 2000
+#   python evaluate.py --hunter hunter_dqn.pth --min-catch-rate 0.6   # exit 1 below the bar
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+import numpy as np
+import torch
+from ai_env import HiderHunterEnv, ACT_MAP
+from ai_models import MLP
+from checkpoint import load_checkpoint
+
+_policies = {}
+
+def load_policy(path, role, input_dim):
+    """MLP from a policy state_dict (*_dqn.pth) or a training checkpoint (*_ckpt.pth)."""
+    state = load_checkpoint(path)
+    if role in state:
+        state = state[role]
+    if 'policy' in state:
+        state = state['policy']
+    policy = MLP(input_dim, len(ACT_MAP))
+    policy.load_state_dict(state)
+    return policy.eval()
+
+def _init_worker(paths, input_dim):
+    torch.set_num_threads(1)  # One process per core already
+    for role, path in paths.items():
+        _policies[role] = load_policy(path, role, input_dim) if path != 'random' else None
+
+def _act(role, obs, rng):
+    policy = _policies[role]
+    if policy is None:
+        return int(rng.integers(len(ACT_MAP)))
+    with torch.inference_mode():
+        return int(policy(torch.from_numpy(obs.astype(np.float32))).argmax())
+
+def play_episode(args):
+    """One episode from seed; the maze, spawns and random actions all derive from it."""
+    seed, map_size, num_rays, max_steps = args
+    random.seed(seed)
+    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
+    env = HiderHunterEnv(map_width=map_size, map_height=map_size, num_rays=num_rays,
+                         max_steps=max_steps)
+    obs_h, obs_t = env.reset()
+    tot_h = tot_t = 0.0
+    caught = False
+    while True:
+        (obs_h, obs_t), (r_h, r_t), done = env.step(_act('hider', obs_h, rng), _act('hunter', obs_t, rng))
+        tot_h += r_h
+        tot_t += r_t
+        if done:
+            caught = r_t > 0
+            break
+    return {'seed': seed, 'caught': caught, 'steps': env.steps, 'reward_hider': tot_h, 'reward_hunter': tot_t}
+
+def _distribution(values):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return None
+    p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+    return {'mean': values.mean(), 'std': values.std(), 'min': values.min(), 'p5': p5, 'p25': p25,
+            'median': p50, 'p75': p75, 'p95': p95, 'max': values.max()}
+
+def summarize(episodes):
+    caught = np.array([e['caught'] for e in episodes])
+    steps = np.array([e['steps'] for e in episodes])
+    return {
+        'episodes': len(episodes),
+        'catch_rate': float(caught.mean()),
+        'time_to_catch': _distribution(steps[caught]),
+        'episode_steps': _distribution(steps),
+        'reward_hider': _distribution([e['reward_hider'] for e in episodes]),
+        'reward_hunter': _distribution([e['reward_hunter'] for e in episodes]),
+    }
+
+def evaluate(hider='random', hunter='random', episodes=1000, seed=0, workers=None,
+             map_size=13, num_rays=21, max_steps=300):
+    """Play episodes with seeds seed .. seed + episodes - 1 and return the summary plus per-episode rows."""
+    input_dim = 2 * num_rays + 6  # Layout of HiderHunterEnv._get_obs
+    paths = {'hider': hider, 'hunter': hunter}
+    jobs = [(seed + i, map_size, num_rays, max_steps) for i in range(episodes)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(paths, input_dim)
+        results = [play_episode(job) for job in jobs]
+    else:
+        with mp.Pool(workers, initializer=_init_worker, initargs=(paths, input_dim)) as pool:
+            results = list(pool.imap_unordered(play_episode, jobs, chunksize=max(1, episodes // (workers * 8))))
+    results.sort(key=lambda e: e['seed'])
+    return summarize(results), results
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless greedy evaluation of hider/hunter policies')
+    parser.add_argument('--hider', default='random', help="policy file or 'random'")
+    parser.add_argument('--hunter', default='random', help="policy file or 'random'")
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help='first episode seed')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--map-size', type=int, default=13)
+    parser.add_argument('--num-rays', type=int, default=21)
+    parser.add_argument('--max-steps', type=int, default=300)
+    parser.add_argument('--out', help='write summary and per-episode results as JSON')
+    parser.add_argument('--min-catch-rate', type=float, help='exit with status 1 if the catch rate is lower')
+    parser.add_argument('--max-catch-rate', type=float, help='exit with status 1 if the catch rate is higher')
+    args = parser.parse_args()
+
+    start = time.time()
+    summary, results = evaluate(args.hider, args.hunter, args.episodes, args.seed, args.workers,
+                                args.map_size, args.num_rays, args.max_steps)
+    elapsed = time.time() - start
+    ttc = summary['time_to_catch']
+    print(f"hider={args.hider} hunter={args.hunter} episodes={summary['episodes']} ({elapsed:.1f}s)")
+    print(f"catch rate     {summary['catch_rate']:.3f}")
+    print(f"time to catch  " + (f"mean {ttc['mean']:.1f}  median {ttc['median']:.0f}" if ttc else "n/a"))
+    for role in ('hider', 'hunter'):
+        d = summary[f'reward_{role}']
+        print(f"reward {role:<7} mean {d['mean']:.1f}  std {d['std']:.1f}  "
+              f"p5 {d['p5']:.1f}  median {d['median']:.1f}  p95 {d['p95']:.1f}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'args': vars(args), 'summary': summary, 'episodes': results}, f, indent=1)
+
+    failed = ((args.min_catch_rate is not None and summary['catch_rate'] < args.min_catch_rate) or
+              (args.max_catch_rate is not None and summary['catch_rate'] > args.max_catch_rate))
+    if failed:
+        print("Catch rate outside the required range.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import math
 import random
 from sprite_object import SpriteObject
 from settings import FAKE_PLAYER_SPEED, FAKE_PLAYER_RADIUS
-from utils import clamp
+from utils import clamp, SQRT2
 
 class FakePlayer(SpriteObject):
     def __init__(self, x, y, map_obj, color, radius=FAKE_PLAYER_RADIUS):
@@ -39,6 +39,8 @@ class FakePlayer(SpriteObject):
     def _has_collision(self, x, y):
         # Check four corners for collisions (circle vs grid)
         r = self.radius
+        if self.map.distance_field is not None and self.map.clearance(x, y) > r * SQRT2:
+            return False
         for ox in (-r, r):
             for oy in (-r, r):
                 tx = x + ox
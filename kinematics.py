@@ -0,0 +1,119 @@
+# kinematics.py
+
+import math
+import numpy as np
+from settings import FAKE_PLAYER_SPEED, FAKE_PLAYER_RADIUS
+
+def collides(game_map, x, y, radius):
+    """Batched Player._has_collision: any corner of the radius box inside a wall."""
+    hit = game_map.is_wall_many(x - radius, y - radius)
+    hit |= game_map.is_wall_many(x - radius, y + radius)
+    hit |= game_map.is_wall_many(x + radius, y - radius)
+    hit |= game_map.is_wall_many(x + radius, y + radius)
+    return hit
+
+def move_delta(angle, forward, strafe, speed, dt):
+    """Displacement of Player.move for arrays of angles and -1/0/1 inputs."""
+    cos_a = np.cos(angle)
+    sin_a = np.sin(angle)
+    step = speed * dt
+    return (cos_a * forward - sin_a * strafe) * step, (sin_a * forward + cos_a * strafe) * step
+
+def try_move(game_map, x, y, dx, dy, radius):
+    """
+    Batched Player.try_move: x first, then y from the updated x, each axis
+    kept only if it does not collide. Returns the new (x, y) arrays.
+    """
+    next_x = x + dx
+    x = np.where(collides(game_map, next_x, y, radius), x, next_x)
+    next_y = y + dy
+    y = np.where(collides(game_map, x, next_y, radius), y, next_y)
+    return x, y
+
+class Kinematics:
+    """
+    Positions, angles, radii and speeds of N agents in arrays, moved with
+    Player.move / Player.rotate semantics in one vectorized pass.
+    """
+    def __init__(self, x, y, angle, radius, move_speed, rot_speed):
+        self.x = np.array(x, dtype=np.float64)
+        n = len(self.x)
+        self.y = np.array(y, dtype=np.float64)
+        self.angle = np.broadcast_to(np.asarray(angle, dtype=np.float64), (n,)).copy()
+        self.radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (n,)).copy()
+        self.move_speed = np.broadcast_to(np.asarray(move_speed, dtype=np.float64), (n,)).copy()
+        self.rot_speed = np.broadcast_to(np.asarray(rot_speed, dtype=np.float64), (n,)).copy()
+
+    @classmethod
+    def from_players(cls, players):
+        return cls([p.x for p in players], [p.y for p in players], [p.angle for p in players],
+                   [p.radius for p in players], [p.move_speed for p in players],
+                   [p.rot_speed for p in players])
+
+    def to_players(self, players):
+        """Write positions and angles back to the Player objects they came from."""
+        for p, x, y, a in zip(players, self.x.tolist(), self.y.tolist(), self.angle.tolist()):
+            p.x, p.y, p.angle = x, y, a
+
+    def __len__(self):
+        return len(self.x)
+
+    def move(self, forward, strafe, game_map, dt):
+        dx, dy = move_delta(self.angle, forward, strafe, self.move_speed, dt)
+        self.try_move(dx, dy, game_map)
+
+    def try_move(self, dx, dy, game_map):
+        self.x, self.y = try_move(game_map, self.x, self.y, dx, dy, self.radius)
+
+    def rotate(self, direction, dt):
+        self.angle = (self.angle + self.rot_speed * direction * dt) % (2 * math.pi)
+
+class Wanderers:
+    """
+    FakePlayer.update for N NPCs at once: each walks straight along
+    target_dir, moving only if the whole step is free, and picks a new
+    direction when its wander timer runs out or it bumps into a wall.
+    """
+    def __init__(self, x, y, target_dir, wander_time, radius=FAKE_PLAYER_RADIUS,
+                 move_speed=FAKE_PLAYER_SPEED, seed=None):
+        self.x = np.array(x, dtype=np.float64)
+        n = len(self.x)
+        self.y = np.array(y, dtype=np.float64)
+        self.target_dir = np.array(target_dir, dtype=np.float64)
+        self.wander_time = np.array(wander_time, dtype=np.float64)
+        self.radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (n,)).copy()
+        self.move_speed = np.broadcast_to(np.asarray(move_speed, dtype=np.float64), (n,)).copy()
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_fake_players(cls, npcs, seed=None):
+        return cls([p.x for p in npcs], [p.y for p in npcs], [p.target_dir for p in npcs],
+                   [p.wander_time for p in npcs], [p.radius for p in npcs],
+                   [p.move_speed for p in npcs], seed)
+
+    def to_fake_players(self, npcs):
+        """Copy state back to the FakePlayer objects used for raycasting and drawing."""
+        for p, x, y, d, t in zip(npcs, self.x.tolist(), self.y.tolist(),
+                                 self.target_dir.tolist(), self.wander_time.tolist()):
+            p.x, p.y, p.target_dir, p.wander_time = x, y, d, t
+
+    def __len__(self):
+        return len(self.x)
+
+    def _pick_new_direction(self, mask):
+        k = int(mask.sum())
+        if k:
+            self.target_dir[mask] = self.rng.uniform(0, 2 * math.pi, size=k)
+            self.wander_time[mask] = self.rng.uniform(0.4, 1.3, size=k)
+
+    def update(self, game_map, dt):
+        self.wander_time -= dt
+        self._pick_new_direction(self.wander_time <= 0)
+        step = self.move_speed * dt
+        next_x = self.x + np.cos(self.target_dir) * step
+        next_y = self.y + np.sin(self.target_dir) * step
+        hit = collides(game_map, next_x, next_y, self.radius)
+        self.x = np.where(hit, self.x, next_x)
+        self.y = np.where(hit, self.y, next_y)
+        # Bounce: try a new direction next update
+        self._pick_new_direction(hit)
@@ -12,6 +12,7 @@ from raycaster import raycast_2d
 from utils import clamp
 from sprite_object import SpriteObject
 from fake_player import FakePlayer
+from kinematics import Wanderers
 from renderer import Renderer
 
 def main():
@@ -32,13 +33,12 @@ def main():
     num_sprites = max(2, (MAP_WIDTH * MAP_HEIGHT) // 45)
     used = set()
     used.add((int(px), int(py)))
-    static_sprites = []
-    for _ in range(num_sprites):
-        sx, sy = game_map.find_random_empty(avoid=used)
-        used.add((int(sx), int(sy)))
-        static_sprites.append(SpriteObject(sx, sy, COLOR_STATIC_SPRITE))
-    fx, fy = game_map.find_random_empty(avoid=used)
-    fake_player = FakePlayer(fx, fy, game_map, COLOR_FAKE_PLAYER)
+    # Sprites and NPCs on distinct cells, away from the player
+    spawns = game_map.sample_empty(num_sprites + NUM_FAKE_PLAYERS, avoid=used).tolist()
+    static_sprites = [SpriteObject(sx, sy, COLOR_STATIC_SPRITE) for sx, sy in spawns[:num_sprites]]
+    fake_players = [FakePlayer(fx, fy, game_map, COLOR_FAKE_PLAYER) for fx, fy in spawns[num_sprites:]]
+    # All NPCs move in one vectorized step; the FakePlayers mirror their state
+    npcs = Wanderers.from_fake_players(fake_players)
     renderer = Renderer(screen, MAP_WIDTH, MAP_HEIGHT)
 
     show_map = False  # Toggle flag
@@ -47,15 +47,17 @@ def main():
         dt = clock.tick(FPS) / 1000.0
         fps = clock.get_fps()
         show_map = handle_events(player, game_map, dt, show_map)
-        fake_player.update(dt)
-        all_objs = static_sprites + [fake_player]
+        npcs.update(game_map, dt)
+        npcs.to_fake_players(fake_players)
+        all_objs = static_sprites + fake_players
+        # Per-FOV broadphase (and optional visibility culling) for many sprites
         rays = raycast_2d(
             player.x, player.y, player.angle,
             PLAYER_FOV, NUM_RAYS, game_map, all_objs)
         renderer.draw_2d_view(
             game_map, player, rays,
-            static_sprites, fake_player, font, dt, fps,
-            show_full_map=show_map)
+            static_sprites, fake_players, font, dt, fps,
+            show_full_map=show_map, objects=all_objs)
         pygame.display.flip()
 
 def handle_events(player, game_map, dt, show_map):
@@ -1,45 +1,253 @@
 # map.py
 
+import itertools
 import random
-from maze_generator import generate_maze, widen_maze
-from settings import CORRIDOR_WIDTH
+import numpy as np
+from maze_generator import generate_maze, widen_maze, generate_maze_array, widen_maze_array
+from settings import CORRIDOR_WIDTH, MAP_GENERATOR, MAP_DISTANCE_FIELD, MAP_VISIBILITY_TABLE, RAY_MAX_DISTANCE
+from visibility import VisibilityTable, line_cells
+
+_map_ids = itertools.count()
+# Above this many cells the nested-list mirrors of walls and clearance are
+# skipped: they cost seconds and ~10-30x the arrays' memory on huge maps.
+LIST_MIRROR_MAX_CELLS = 1 << 20
 
 class Map:
-    def __init__(self, width, height):
+    def __init__(self, width, height, distance_field=MAP_DISTANCE_FIELD, visibility=MAP_VISIBILITY_TABLE,
+                 generator=MAP_GENERATOR, seed=None):
         self.corridor_width = CORRIDOR_WIDTH
-        coarse_maze = generate_maze(width, height)
-        if self.corridor_width > 1:
-            self.grid = widen_maze(coarse_maze, corridor_width=self.corridor_width)
+        if generator == 'python':
+            coarse_maze = generate_maze(width, height)
+            if self.corridor_width > 1:
+                coarse_maze = widen_maze(coarse_maze, corridor_width=self.corridor_width)
+            occupancy = np.array(coarse_maze) == '#'
         else:
-            self.grid = coarse_maze
-        self.width = len(self.grid[0])
-        self.height = len(self.grid)
+            # NumPy generators; without a seed, draw one so random.seed() still fixes the maze
+            if seed is None:
+                seed = random.getrandbits(64)
+            occupancy = generate_maze_array(width, height, generator, seed)
+            if self.corridor_width > 1:
+                occupancy = widen_maze_array(occupancy, self.corridor_width)
+        self._load(occupancy, distance_field, visibility)
+
+    @classmethod
+    def from_occupancy(cls, occupancy, distance_field=MAP_DISTANCE_FIELD, visibility=MAP_VISIBILITY_TABLE,
+                       field=None, corridor_width=CORRIDOR_WIDTH):
+        """
+        Map from a (height, width) bool array, True = wall, e.g. a maze pool
+        entry. field: precomputed padded clearance (_box_distance_field of
+        the padded walls), used instead of building the distance field.
+        """
+        game_map = cls.__new__(cls)
+        game_map.corridor_width = corridor_width
+        game_map._load(occupancy, distance_field, visibility, field)
+        return game_map
+
+    @classmethod
+    def from_arrays(cls, walls, free_cells, field=None, visibility=MAP_VISIBILITY_TABLE,
+                    corridor_width=CORRIDOR_WIDTH):
+        """
+        Map over existing arrays without copying them, e.g. memory-mapped maze
+        pool entries: walls is the padded (height + 2, width + 2) bool array,
+        free_cells the (n, 2) floor cells, field the padded clearance or None.
+        Scalar lookups index the arrays directly, so this is O(1) in map size.
+        """
+        game_map = cls.__new__(cls)
+        game_map.corridor_width = corridor_width
+        game_map.map_id = next(_map_ids)
+        game_map._set_walls(walls, mirror=False)
+        game_map.free_cells = free_cells
+        game_map.distance_field = None
+        if field is not None:
+            game_map._set_distance_field(field, mirror=False)
+        game_map.visibility = None
+        if visibility:
+            game_map.build_visibility()
+        return game_map
+
+    def _load(self, occupancy, distance_field, visibility, field=None):
+        self.map_id = next(_map_ids)  # unique per instance, unlike id()
+        h, w = occupancy.shape
+        # True = wall, indexed [y + 1, x + 1]: the map plus a one-cell wall
+        # border, so lookups up to one cell outside the map need no bounds check.
+        walls = np.ones((h + 2, w + 2), dtype=bool)
+        walls[1:-1, 1:-1] = occupancy
+        self._set_walls(walls)
+        # Floor cells as (x, y), row-major, for O(1) random spawns
+        free_y, free_x = np.nonzero(~self.occupancy)
+        self.free_cells = np.stack([free_x, free_y], axis=1)
+        # Optional clearance per cell (see build_distance_field), None if disabled
+        self.distance_field = None
+        if field is not None:
+            self._set_distance_field(np.asarray(field, dtype=np.float32))
+        elif distance_field:
+            self.build_distance_field()
+        # Optional cell-to-cell line-of-sight table (see visibility.py)
+        self.visibility = None
+        if visibility:
+            self.build_visibility()
+
+    def _set_walls(self, walls, mirror=True):
+        self.walls = walls
+        self.height, self.width = walls.shape[0] - 2, walls.shape[1] - 2
+        # Unpadded view, indexed [y, x]; used by the vectorized raycaster
+        self.occupancy = walls[1:-1, 1:-1]
+        self._grid = None
+        # Plain nested-list mirror for scalar lookups (faster than indexing
+        # numpy); huge or shared maps index the array itself, which takes [iy][ix] too
+        self._wall_rows = walls.tolist() if mirror and walls.size <= LIST_MIRROR_MAX_CELLS else walls
 
     def is_wall(self, x, y):
-        ix, iy = int(x), int(y)
-        if ix < 0 or iy < 0 or ix >= self.width or iy >= self.height:
-            return True
-        return self.grid[iy][ix] == '#'
+        # Outside the map is wall, as in is_wall_many's clamping to the border
+        ix = int(x) + 1
+        iy = int(y) + 1
+        if 0 < ix <= self.width and 0 < iy <= self.height:
+            return self._wall_rows[iy][ix]
+        return True
+
+    def is_wall_many(self, xs, ys):
+        """Batched is_wall: returns a bool array for arrays of x and y coordinates."""
+        ix = np.asarray(xs).astype(np.int64) + 1
+        iy = np.asarray(ys).astype(np.int64) + 1
+        np.clip(ix, 0, self.width + 1, out=ix)
+        np.clip(iy, 0, self.height + 1, out=iy)
+        return self.walls[iy, ix]
+
+    def build_distance_field(self, cap=RAY_MAX_DISTANCE):
+        """
+        Precomputes, for every cell, the Euclidean distance from anywhere in
+        that cell to the nearest wall cell (0 for walls and for cells touching
+        a wall, capped at cap). Any point in a cell can move that far in any
+        direction without entering a wall.
+        """
+        self._set_distance_field(_box_distance_field(self.walls, cap))
+
+    def _set_distance_field(self, field, mirror=True):
+        self.distance_field = field[1:-1, 1:-1]
+        self._clearance_rows = field.tolist() if mirror and field.size <= LIST_MIRROR_MAX_CELLS else field
+
+    def clearance(self, x, y):
+        """O(1) lower bound on the distance from (x, y) to the nearest wall."""
+        # Outside the map is wall (see is_wall), so no clearance
+        ix = int(x) + 1
+        iy = int(y) + 1
+        if 0 < ix <= self.width and 0 < iy <= self.height:
+            return self._clearance_rows[iy][ix]
+        return 0.0
+
+    def build_visibility(self, max_range=RAY_MAX_DISTANCE):
+        self.visibility = VisibilityTable(self.walls, max_range)
+
+    def can_see(self, x0, y0, x1, y1, max_range=RAY_MAX_DISTANCE):
+        """
+        Line of sight between the centers of the cells containing both points,
+        up to max_range. A table lookup if build_visibility() was called.
+        """
+        if self.visibility is not None:
+            return self.visibility.can_see(x0, y0, x1, y1)
+        ax, ay, bx, by = int(x0), int(y0), int(x1), int(y1)
+        if self.is_wall(x0, y0) or self.is_wall(x1, y1):
+            return False
+        if (bx - ax) ** 2 + (by - ay) ** 2 > max_range * max_range:
+            return False
+        for dx, dy in line_cells(bx - ax, by - ay):
+            if self.is_wall(ax + dx + 0.5, ay + dy + 0.5):
+                return False
+        return True
+
+    @property
+    def grid(self):
+        """Rows of '#' / ' ' characters, built on first use (only the renderer needs them)."""
+        if self._grid is None:
+            self._grid = np.where(self.occupancy, '#', ' ').tolist()
+        return self._grid
 
     def get_grid(self):
         return self.grid
 
     def get_start_pos(self):
         # Find first open cell
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x] == ' ':
-                    return (x + 0.5, y + 0.5)
+        if len(self.free_cells):
+            x, y = self.free_cells[0].tolist()
+            return (x + 0.5, y + 0.5)
 
     def find_random_empty(self, avoid=None):
-        empty = []
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x] == ' ':
-                    if avoid is not None and (x, y) in avoid:
-                        continue
-                    empty.append((x, y))
-        if not empty:
+        """Center of a uniformly random floor cell whose (x, y) is not in avoid."""
+        empty = self.free_cells
+        if avoid and len(avoid) * 2 >= len(empty):
+            # Mostly avoided: filter once rather than retry many times
+            empty = [cell for cell in map(tuple, empty.tolist()) if cell not in avoid]
+            avoid = None
+        if not len(empty):
             raise Exception('No empty cell in map')
-        x, y = random.choice(empty)
-        return (x + 0.5, y + 0.5)
\ No newline at end of file
+        # randrange draws exactly like the old random.choice over the scanned list
+        x, y = (int(v) for v in empty[random.randrange(len(empty))])
+        if avoid:
+            # Rejection sampling, under two draws on average here
+            while (x, y) in avoid:
+                x, y = (int(v) for v in empty[random.randrange(len(empty))])
+        return (x + 0.5, y + 0.5)
+
+    def sample_empty(self, k, avoid=None, rng=np.random):
+        """
+        Centers of k distinct random floor cells not in avoid, as a (k, 2)
+        float array. rng: np.random or a np.random.Generator.
+        """
+        cells = self.free_cells
+        avoid = set(avoid) if avoid else set()
+        if (k + len(avoid)) * 4 > len(cells):
+            # A large share of the map: filter and draw without replacement,
+            # where the O(free cells) permutation is comparable to the output
+            if avoid:
+                avoid_ids = [y * self.width + x for x, y in avoid]
+                cells = cells[~np.isin(cells[:, 1] * self.width + cells[:, 0], avoid_ids)]
+            if k > len(cells):
+                raise Exception(f'Only {len(cells)} empty cells in map, {k} requested')
+            return cells[rng.choice(len(cells), size=k, replace=False)] + 0.5
+        # Few cells: rejection-sample indices, O(k) instead of a permutation of every free cell
+        draw = rng.integers if hasattr(rng, 'integers') else rng.randint
+        chosen = {}
+        while len(chosen) < k:
+            for i in draw(len(cells), size=k - len(chosen)).tolist():
+                if i not in chosen and tuple(cells[i].tolist()) not in avoid:
+                    chosen[i] = None
+        return cells[list(chosen)] + 0.5
+
+def _box_distance_field(walls, cap):
+    """
+    Distance from each cell's box to the nearest wall box. That equals the
+    center-to-center distance to the walls grown by one cell (3x3), so this is
+    a capped, separable exact EDT over the grown wall set.
+    """
+    h, w = walls.shape
+    grown = walls.copy()
+    grown[1:, :] |= walls[:-1, :]
+    grown[:-1, :] |= walls[1:, :]
+    grown_rows = grown.copy()
+    grown[:, 1:] |= grown_rows[:, :-1]
+    grown[:, :-1] |= grown_rows[:, 1:]
+
+    reach = int(np.ceil(cap)) + 1
+    # Pass 1: vertical distance to the nearest grown wall in the same column.
+    col = np.full((h, w), reach, dtype=np.float32)
+    run = np.full(w, reach, dtype=np.float32)
+    for y in range(h):
+        run = np.where(grown[y], 0, np.minimum(run + 1, reach))
+        col[y] = run
+    run = np.full(w, reach, dtype=np.float32)
+    for y in range(h - 1, -1, -1):
+        run = np.where(grown[y], 0, np.minimum(run + 1, reach))
+        col[y] = np.minimum(col[y], run)
+    # Pass 2: combine horizontally, min over dx of dx^2 + col[x + dx]^2.
+    # In bands of rows, so huge maps never hold several full-size temporaries.
+    out = col
+    band = max(1, (1 << 20) // max(w, 1))
+    for y0 in range(0, h, band):
+        col2 = col[y0:y0 + band] * col[y0:y0 + band]
+        padded = np.pad(col2, ((0, 0), (reach, reach)), constant_values=reach * reach)
+        dist2 = col2
+        for dx in range(1, reach + 1):
+            np.minimum(dist2, padded[:, reach + dx:reach + dx + w] + dx * dx, out=dist2)
+            np.minimum(dist2, padded[:, reach - dx:reach - dx + w] + dx * dx, out=dist2)
+        np.minimum(np.sqrt(dist2), cap, out=out[y0:y0 + band])
+    return out
@@ -1,6 +1,7 @@
 # maze_generator.py
 
 import random
+import numpy as np
 from settings import CORRIDOR_WIDTH
 
 def generate_maze(width, height):
@@ -50,4 +51,96 @@ def widen_maze(cells, corridor_width=2):
                 for dy in range(corridor_width):
                     for dx in range(corridor_width):
                         out[y*corridor_width+dy][x*corridor_width+dx] = ' '
-    return out
\ No newline at end of file
+    return out
+
+def generate_maze_array(width, height, algorithm='backtracker', seed=None):
+    """
+    NumPy counterpart of generate_maze: a (height, width) bool array with
+    True = wall, cells at odd coordinates. The same seed gives the same maze.
+    algorithm: 'backtracker' (iterative DFS, long winding corridors) or
+    'kruskal' (randomized Kruskal with union-find, more branching).
+    """
+    rng = np.random.default_rng(seed)
+    cells_h, cells_w = (height - 1) // 2, (width - 1) // 2
+    if algorithm == 'backtracker':
+        a, b = _backtracker_edges(cells_w, cells_h, rng)
+    elif algorithm == 'kruskal':
+        a, b = _kruskal_edges(cells_w, cells_h, rng)
+    else:
+        raise ValueError(f'Unknown maze algorithm: {algorithm!r}')
+    maze = np.ones((height, width), dtype=bool)
+    maze[1:2 * cells_h:2, 1:2 * cells_w:2] = False
+    # The wall between cells a and b sits halfway between their odd coordinates.
+    ay, ax = np.divmod(a, cells_w)
+    by, bx = np.divmod(b, cells_w)
+    maze[ay + by + 1, ax + bx + 1] = False
+    return maze
+
+def _backtracker_edges(cells_w, cells_h, rng):
+    """Passages (a, b) of a DFS spanning tree, as flat cell index arrays."""
+    n = cells_w * cells_h
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    visited = bytearray(n)
+    stack = [0] * n           # Preallocated; sp is the top
+    edge_a = [0] * (n - 1)
+    edge_b = [0] * (n - 1)
+    draws = rng.random(n).tolist()   # One draw per carved passage
+    visited[0] = 1
+    sp = 0
+    carved = 0
+    last = cells_w - 1
+    while sp >= 0:
+        c = stack[sp]
+        x = c % cells_w
+        options = []
+        if x > 0 and not visited[c - 1]:
+            options.append(c - 1)
+        if x < last and not visited[c + 1]:
+            options.append(c + 1)
+        if c >= cells_w and not visited[c - cells_w]:
+            options.append(c - cells_w)
+        if c + cells_w < n and not visited[c + cells_w]:
+            options.append(c + cells_w)
+        if options:
+            nxt = options[int(draws[carved] * len(options))]
+            visited[nxt] = 1
+            edge_a[carved] = c
+            edge_b[carved] = nxt
+            carved += 1
+            sp += 1
+            stack[sp] = nxt
+        else:
+            sp -= 1
+    return np.array(edge_a, dtype=np.int64), np.array(edge_b, dtype=np.int64)
+
+def _kruskal_edges(cells_w, cells_h, rng):
+    """Passages (a, b) of a randomized Kruskal spanning tree."""
+    ids = np.arange(cells_w * cells_h).reshape(cells_h, cells_w)
+    a = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    b = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    order = rng.permutation(len(a))
+    a, b = a[order], b[order]
+    parent = list(range(cells_w * cells_h))
+    keep = bytearray(len(a))
+    remaining = cells_w * cells_h - 1
+    for i, (u, v) in enumerate(zip(a.tolist(), b.tolist())):
+        if remaining == 0:
+            break
+        # Find with path halving
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        if u != v:
+            parent[u] = v
+            keep[i] = 1
+            remaining -= 1
+    keep = np.frombuffer(bytes(keep), dtype=np.uint8).astype(bool)
+    return a[keep], b[keep]
+
+def widen_maze_array(maze, corridor_width=2):
+    """widen_maze for bool arrays: every cell becomes a corridor_width square block."""
+    return np.repeat(np.repeat(maze, corridor_width, axis=0), corridor_width, axis=1)
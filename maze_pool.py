@@ -0,0 +1,150 @@
+# maze_pool.py
+#
+# Pre-generated maze library in a single memory-mapped file, so envs can
+# start every episode on a fresh maze without generating one:
+#
+#   python maze_pool.py --out mazes.bin --count 5000 --size 13
+#
+# Layout (little-endian):
+#   header  : magic 'RCMAZES2', count (int64), index offset (int64)
+#   index   : count rows of (walls offset, height, width, field offset,
+#             free offset, free count) int64
+#   payload : per maze, the padded (height + 2, width + 2) uint8 walls
+#             (1 = wall, one-cell wall border as in Map.walls), the padded
+#             float32 clearance field (field offset -1 if the pool was built
+#             without it), then the (free count, 2) int64 floor cells (x, y)
+#
+# Everything a Map needs is stored ready-made, so get_map() wraps views of
+# the mapping and a pooled reset does not scale with maze size.
+
+import argparse
+import random
+import time
+import numpy as np
+from map import Map, _box_distance_field
+from settings import CORRIDOR_WIDTH, MAP_DISTANCE_FIELD, MAP_VISIBILITY_TABLE, RAY_MAX_DISTANCE
+
+MAGIC = b'RCMAZES2'
+HEADER = np.dtype([('magic', 'S8'), ('count', '<i8'), ('index_offset', '<i8')])
+INDEX = np.dtype([('walls', '<i8'), ('height', '<i8'), ('width', '<i8'), ('field', '<i8'),
+                  ('free', '<i8'), ('free_count', '<i8')])
+
+def _align(offset, n=8):
+    return (offset + n - 1) // n * n
+
+def write_pool(path, occupancies, distance_field=MAP_DISTANCE_FIELD, cap=RAY_MAX_DISTANCE):
+    """Write (height, width) bool arrays (True = wall) as a maze pool file."""
+    index = np.zeros(len(occupancies), dtype=INDEX)
+    offset = _align(HEADER.itemsize + index.nbytes)
+    chunks = []
+    for i, occ in enumerate(occupancies):
+        occ = np.asarray(occ, dtype=bool)
+        h, w = occ.shape
+        walls = np.ones((h + 2, w + 2), dtype=bool)
+        walls[1:-1, 1:-1] = occ
+        index[i] = (offset, h, w, -1, -1, 0)
+        chunks.append((offset, walls.view(np.uint8)))
+        offset = _align(offset + walls.size)
+        if distance_field:
+            index[i]['field'] = offset
+            field = _box_distance_field(walls, cap)
+            chunks.append((offset, field))
+            offset = _align(offset + field.nbytes)
+        # Same order as Map._load's free_cells
+        free_y, free_x = np.nonzero(~occ)
+        free = np.stack([free_x, free_y], axis=1).astype(np.int64)
+        index[i]['free'] = offset
+        index[i]['free_count'] = len(free)
+        chunks.append((offset, free))
+        offset = _align(offset + free.nbytes)
+    header = np.array([(MAGIC, len(occupancies), HEADER.itemsize)], dtype=HEADER)
+    # Written through a memmap of the final size, so the pool never sits in memory twice.
+    out = np.memmap(path, dtype=np.uint8, mode='w+', shape=(max(offset, HEADER.itemsize + index.nbytes),))
+    out[:HEADER.itemsize] = header.view(np.uint8)
+    out[HEADER.itemsize:HEADER.itemsize + index.nbytes] = index.view(np.uint8)
+    for start, data in chunks:
+        out[start:start + data.nbytes] = data.reshape(-1).view(np.uint8)
+    out.flush()
+    del out
+
+def build_pool(path, count, width, height, corridor_width=CORRIDOR_WIDTH, seed=0,
+               distance_field=MAP_DISTANCE_FIELD):
+    """Generate count widened mazes with Map's generator and write them to path."""
+    random.seed(seed)
+    occupancies = [Map(width, height, distance_field=False, visibility=False).occupancy.copy()
+                   for _ in range(count)]
+    write_pool(path, occupancies, distance_field)
+
+class MazePool:
+    """
+    Read-only view of a maze pool file. Opened with np.memmap, so lookups
+    parse nothing and every process mapping the file shares the OS page
+    cache instead of holding a private copy.
+    """
+    def __init__(self, path, corridor_width=CORRIDOR_WIDTH):
+        self.path = path
+        self.corridor_width = corridor_width
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        header = self.data[:HEADER.itemsize].view(HEADER)[0]
+        if header['magic'] != MAGIC:
+            if header['magic'].startswith(MAGIC[:-1]):
+                raise ValueError(f'{path} is an older maze pool format; rebuild it with maze_pool.py')
+            raise ValueError(f'{path} is not a maze pool file')
+        self.count = int(header['count'])
+        start = int(header['index_offset'])
+        self.index = self.data[start:start + self.count * INDEX.itemsize].view(INDEX)
+
+    def __len__(self):
+        return self.count
+
+    def walls(self, i):
+        """Padded (height + 2, width + 2) bool view of maze i, True = wall."""
+        offset, h, w = (int(v) for v in self.index[i][['walls', 'height', 'width']].tolist())
+        size = (h + 2) * (w + 2)
+        return self.data[offset:offset + size].view(np.bool_).reshape(h + 2, w + 2)
+
+    def occupancy(self, i):
+        """(height, width) bool view of maze i, True = wall."""
+        return self.walls(i)[1:-1, 1:-1]
+
+    def field(self, i):
+        """Padded clearance field of maze i, or None if the pool has none."""
+        offset, h, w = (int(v) for v in self.index[i][['field', 'height', 'width']].tolist())
+        if offset < 0:
+            return None
+        size = (h + 2) * (w + 2) * 4
+        return self.data[offset:offset + size].view(np.float32).reshape(h + 2, w + 2)
+
+    def free_cells(self, i):
+        """(n, 2) int64 view of maze i's floor cells as (x, y), row-major."""
+        offset, n = (int(v) for v in self.index[i][['free', 'free_count']].tolist())
+        return self.data[offset:offset + n * 16].view(np.int64).reshape(n, 2)
+
+    def get_map(self, i, distance_field=MAP_DISTANCE_FIELD, visibility=MAP_VISIBILITY_TABLE):
+        """Map over views of maze i: no per-call copies unless the pool lacks a wanted field."""
+        field = self.field(i) if distance_field else None
+        game_map = Map.from_arrays(self.walls(i), self.free_cells(i), field, visibility,
+                                   corridor_width=self.corridor_width)
+        if distance_field and field is None:
+            game_map.build_distance_field()
+        return game_map
+
+    def sample_map(self, rng=random, **kwargs):
+        """Map for a uniformly chosen maze; rng is anything with randrange (default: random module)."""
+        return self.get_map(rng.randrange(self.count), **kwargs)
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-generate a memory-mapped maze pool')
+    parser.add_argument('--out', default='mazes.bin')
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--size', type=int, default=13, help='coarse maze width and height (odd)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-distance-field', action='store_true', help='store walls only')
+    args = parser.parse_args()
+    start = time.time()
+    build_pool(args.out, args.count, args.size, args.size, seed=args.seed,
+               distance_field=not args.no_distance_field)
+    print(f'Wrote {args.count} mazes to {args.out} in {time.time() - start:.1f}s')
+
+if __name__ == "__main__":
+    main()
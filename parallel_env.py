@@ -0,0 +1,152 @@
+# parallel_env.py
+
+import multiprocessing as mp
+import random
+from multiprocessing import shared_memory
+import numpy as np
+from vec_env import VecHiderHunterEnv
+
+def _buffer_specs(n_envs, obs_dim):
+    """Name -> (shape, dtype) of every shared array."""
+    return {
+        'actions': ((n_envs, 2), np.int64),
+        'obs': ((2, n_envs, obs_dim), np.float32),
+        'final_obs': ((2, n_envs, obs_dim), np.float32),
+        'rewards': ((2, n_envs), np.float32),
+        'done': ((n_envs,), np.bool_),
+    }
+
+def _attach(shm_names, specs):
+    blocks = {}
+    arrays = {}
+    for name, (shape, dtype) in specs.items():
+        # Workers share the parent's resource tracker, so attaching here does
+        # not add a second owner; only the parent unlinks the blocks.
+        shm = shared_memory.SharedMemory(name=shm_names[name])
+        blocks[name] = shm
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return blocks, arrays
+
+def _worker(conn, shm_names, n_envs, obs_dim, lo, hi, env_kwargs, seed):
+    random.seed(seed)  # Map generation uses the random module
+    env = VecHiderHunterEnv(hi - lo, seed=seed, **env_kwargs)
+    blocks, arrays = _attach(shm_names, _buffer_specs(n_envs, obs_dim))
+    obs, final_obs = arrays['obs'], arrays['final_obs']
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == 'step':
+                actions = arrays['actions'][lo:hi]
+                (o_h, o_t), (r_h, r_t), done, (f_h, f_t) = env.step(actions[:, 0], actions[:, 1])
+                obs[0, lo:hi], obs[1, lo:hi] = o_h, o_t
+                final_obs[0, lo:hi], final_obs[1, lo:hi] = f_h, f_t
+                arrays['rewards'][0, lo:hi], arrays['rewards'][1, lo:hi] = r_h, r_t
+                arrays['done'][lo:hi] = done
+            elif cmd == 'reset':
+                o_h, o_t = env.reset()
+                obs[0, lo:hi], obs[1, lo:hi] = o_h, o_t
+            elif cmd == 'close':
+                break
+            conn.send(True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del obs, final_obs, arrays
+        for shm in blocks.values():
+            shm.close()
+        conn.close()
+
+class ParallelHiderHunterEnv:
+    """
+    K worker processes, each stepping a VecHiderHunterEnv slice of
+    envs_per_worker envs. Actions, observations, rewards and done flags live
+    in multiprocessing.shared_memory arrays; the pipes only carry one short
+    command per step. Same step()/reset() interface as VecHiderHunterEnv
+    over n_workers * envs_per_worker envs. Each worker builds its own maze.
+    """
+    def __init__(self, n_workers, envs_per_worker, seed=0, start_method=None, **env_kwargs):
+        self.n_workers = n_workers
+        self.n_envs = n_workers * envs_per_worker
+        num_rays = env_kwargs.get('num_rays', 15)
+        self.obs_dim = 2 * num_rays + 6
+        specs = _buffer_specs(self.n_envs, self.obs_dim)
+        self._blocks = {}
+        self._arrays = {}
+        for name, (shape, dtype) in specs.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks[name] = shm
+            self._arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        shm_names = {name: shm.name for name, shm in self._blocks.items()}
+
+        ctx = mp.get_context(start_method)
+        self._conns = []
+        self._procs = []
+        for rank in range(n_workers):
+            lo, hi = rank * envs_per_worker, (rank + 1) * envs_per_worker
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child, shm_names, self.n_envs, self.obs_dim, lo, hi, env_kwargs, seed + rank))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self.closed = False
+        self._waiting = False
+
+    def _broadcast(self, cmd):
+        for conn in self._conns:
+            conn.send(cmd)
+
+    def _wait(self):
+        for conn in self._conns:
+            conn.recv()
+
+    def reset(self):
+        self._broadcast('reset')
+        self._wait()
+        obs = self._arrays['obs']
+        return obs[0].copy(), obs[1].copy()
+
+    def step_async(self, actions_hider, actions_hunter):
+        self._arrays['actions'][:, 0] = actions_hider
+        self._arrays['actions'][:, 1] = actions_hunter
+        self._broadcast('step')
+        self._waiting = True
+
+    def step_wait(self):
+        self._wait()
+        self._waiting = False
+        a = self._arrays
+        # Copies: the shared buffers are overwritten by the next step.
+        return ((a['obs'][0].copy(), a['obs'][1].copy()),
+                (a['rewards'][0].copy(), a['rewards'][1].copy()),
+                a['done'].copy(),
+                (a['final_obs'][0].copy(), a['final_obs'][1].copy()))
+
+    def step(self, actions_hider, actions_hunter):
+        """Same return value as VecHiderHunterEnv.step."""
+        self.step_async(actions_hider, actions_hunter)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        if self._waiting:
+            self._wait()
+        self._broadcast('close')
+        for proc in self._procs:
+            proc.join(timeout=5)
+        for conn in self._conns:
+            conn.close()
+        self._arrays = {}
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -6,6 +6,7 @@ from ai_env import HiderHunterEnv
 from ai_models import DQNAgent
 from settings import *
 from renderer import Renderer
+from trajectory_log import TrajectoryWriter
 
 def main():
     pygame.init()
@@ -17,10 +18,13 @@ def main():
     input_dim = len(env._get_obs(env.hider, env.hunter))
     n_actions = 7
     ai = DQNAgent(input_dim, n_actions)
-    ai.policy.load_state_dict(torch.load('hider_dqn.pth', map_location='mps'))  # Now load the hider policy!
+    ai.policy.load_state_dict(torch.load('hider_dqn.pth', map_location=ai.device))  # Now load the hider policy!
     ai.policy.eval()
 
     obs_h, obs_t = env.reset()
+    log = TrajectoryWriter(TRAJECTORY_LOG_FILE) if TRAJECTORY_LOG_FILE else None
+    if log:
+        log.begin_episode(env)
     done = False
     total_r = 0
     renderer = Renderer(screen, env.map.width, env.map.height)
@@ -32,6 +36,8 @@ def main():
         action_h = ai.select(obs_h, n_actions)    # AI is hider (evader)
 
         (next_obs_h, next_obs_t), (r_h, r_t), done = env.step(action_h, action_t)
+        if log:
+            log.log_step(env, action_h, action_t, r_h, r_t, done)
         obs_h, obs_t = next_obs_h, next_obs_t
         total_r += r_t    # Reward for HUNTER (you!)
 
@@ -41,10 +47,14 @@ def main():
         if done:
             pygame.time.wait(700)
             obs_h, obs_t = env.reset()
+            if log:
+                log.begin_episode(env)
             total_r = 0
             done = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if log:
+                    log.close()
                 import sys
                 sys.exit()
 
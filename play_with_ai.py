@@ -5,6 +5,7 @@ from ai_env import HiderHunterEnv
 from ai_models import DQNAgent
 from settings import *
 from renderer import Renderer
+from trajectory_log import TrajectoryWriter
 
 def main():
     pygame.init()
@@ -18,7 +19,7 @@ def main():
     # AI is hider, load hider weights (or use random policy line if no model)
     ai = DQNAgent(input_dim, n_actions)
     try:
-        ai.policy.load_state_dict(torch.load('hider_dqn.pth', map_location='mps'))
+        ai.policy.load_state_dict(torch.load('hider_dqn.pth', map_location=ai.device))
         ai.policy.eval()
         def hider_policy(obs, n_actions): return ai.select(obs, n_actions)
     except Exception:
@@ -26,6 +27,9 @@ def main():
         def hider_policy(obs, n_actions): return np.random.randint(n_actions)
 
     obs_h, obs_t = env.reset()
+    log = TrajectoryWriter(TRAJECTORY_LOG_FILE) if TRAJECTORY_LOG_FILE else None
+    if log:
+        log.begin_episode(env)
     done = False
     total_r = 0
     renderer = Renderer(screen, env.map.width, env.map.height)
@@ -36,6 +40,8 @@ def main():
         action_t = get_action_from_keyboard()
         action_h = hider_policy(obs_h, n_actions)
         (next_obs_h, next_obs_t), (r_h, r_t), done = env.step(action_h, action_t)
+        if log:
+            log.log_step(env, action_h, action_t, r_h, r_t, done)
         obs_h, obs_t = next_obs_h, next_obs_t
         total_r += r_t  # Hunter's reward
 
@@ -50,7 +56,7 @@ def main():
             # Optional: for pure camera, can set to [] but showing rays is useful
             # Below: rays for hunter, objects: draw hider as "sprite"
             raycast_obs(env.hunter, env.hider, env),  # Rays for hunter towards hider
-            [env.hider], hunter_fake, font, 0, 0,
+            [env.hider], [hunter_fake], font, 0, 0,
             show_full_map=True)
         rect = renderer.surface.get_rect()
         renderer.surface.blit(font.render(f"Reward: {total_r:.1f}", True, (250,250,250)), (8, rect.bottom-30))
@@ -58,10 +64,14 @@ def main():
         if done:
             pygame.time.wait(700)
             obs_h, obs_t = env.reset()
+            if log:
+                log.begin_episode(env)
             total_r = 0
             done = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if log:
+                    log.close()
                 import sys
                 sys.exit()
 
@@ -1,7 +1,7 @@
 # player.py
 
 import math
-from utils import clamp
+from utils import clamp, SQRT2
 
 class Player:
     def __init__(self, x, y, angle, radius, move_speed, rot_speed):
@@ -31,6 +31,10 @@ class Player:
             self.y = next_y
 
     def _has_collision(self, x, y, game_map):
+        # Corners of the bounding square are radius*sqrt(2) away, so enough
+        # clearance means none of them can be in a wall.
+        if game_map.distance_field is not None and game_map.clearance(x, y) > self.radius * SQRT2:
+            return False
         # Check for collision (circle vs grid)
         for ox in (-self.radius, self.radius):
             for oy in (-self.radius, self.radius):
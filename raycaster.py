@@ -1,12 +1,14 @@
 # raycaster.py
 
 import math
-from settings import RAY_MAX_DISTANCE, RAY_STEP_SIZE
+import numpy as np
+from settings import RAY_MAX_DISTANCE, RAY_STEP_SIZE, RAY_ENGINE, OBJECT_VISIBILITY_CULLING
 
 def raycast_2d(player_x, player_y, player_angle, fov, num_rays, game_map, objects=[]):
     """
     Returns a list of dicts:
       [{'hit': True/False, 'hit_x': float, 'hit_y': float, 'distance': float, 'ray_angle': float,
+        'side': 'x' / 'y' (wall face that was hit) or None,
         'object_hit': object or None,
         'object_hit_x': float (if hit),
         'object_hit_y': float (if hit),
@@ -17,65 +19,505 @@ def raycast_2d(player_x, player_y, player_angle, fov, num_rays, game_map, object
     half_fov = fov / 2
     start_angle = player_angle - half_fov
     step = fov / max(num_rays - 1, 1)
+    # Broadphase once per FOV: only objects inside the view wedge can be hit.
+    if OBJECT_VISIBILITY_CULLING and game_map.visibility is not None and objects:
+        # Table lookup by cell centers: cheap, but may drop objects only partly in view.
+        seen = game_map.visibility.visible_mask(
+            player_x, player_y, [obj.x for obj in objects], [obj.y for obj in objects])
+        objects = [obj for obj, ok in zip(objects, seen) if ok]
+    candidates = _object_candidates(player_x, player_y, objects, player_angle, half_fov)
     result = []
     for i in range(num_rays):
         ray_a = start_angle + (i * step)
-        res = single_ray(player_x, player_y, ray_a, game_map, objects)
+        res = _cast_single(player_x, player_y, ray_a, game_map, candidates, RAY_ENGINE)
         res['ray_angle'] = ray_a
         result.append(res)
     return result
 
-def single_ray(x0, y0, angle, game_map, objects):
+def single_ray(x0, y0, angle, game_map, objects, engine=None):
+    """Casts one ray. engine: 'step', 'dda' or 'sphere', defaults to settings.RAY_ENGINE."""
+    candidates = _object_candidates(x0, y0, objects)
+    return _cast_single(x0, y0, angle, game_map, candidates, engine or RAY_ENGINE)
+
+def _cast_single(x0, y0, angle, game_map, candidates, engine):
     sin_a = math.sin(angle)
     cos_a = math.cos(angle)
+    max_dist = RAY_MAX_DISTANCE
+    if engine == 'dda':
+        hit_wall, distance, side = _dda_wall(x0, y0, cos_a, sin_a, game_map, max_dist)
+        x = x0 + cos_a * distance
+        y = y0 + sin_a * distance
+    elif engine == 'sphere':
+        hit_wall, distance, side = _sphere_wall(x0, y0, cos_a, sin_a, game_map, max_dist)
+        x = x0 + cos_a * distance
+        y = y0 + sin_a * distance
+    elif engine == 'step':
+        hit_wall, x, y, distance, side = _step_wall(x0, y0, cos_a, sin_a, game_map, max_dist)
+    else:
+        raise ValueError(f'Unknown ray engine: {engine}')
+
+    # Objects are only hit in front of the wall (and within range).
+    quantum = RAY_STEP_SIZE if engine == 'step' else None
+    object_hit, object_hit_distance = _first_object_hit(
+        angle, cos_a, sin_a, candidates, min(distance, max_dist), quantum)
+    object_hit_x = object_hit_y = None
+    if object_hit is not None:
+        object_hit_x = x0 + cos_a * object_hit_distance
+        object_hit_y = y0 + sin_a * object_hit_distance
+    return _make_result(hit_wall, x, y, distance, side,
+                        object_hit, object_hit_distance, object_hit_x, object_hit_y)
+
+def _step_wall(x0, y0, cos_a, sin_a, game_map, max_dist):
+    """Legacy marcher: advances RAY_STEP_SIZE cells at a time."""
     x = x0
     y = y0
+    prev_x, prev_y = x0, y0
     distance = 0.0
-    max_dist = RAY_MAX_DISTANCE
-    hit_wall = False
-    object_hit = None
-    object_hit_distance = float('inf')
-    object_hit_x = None
-    object_hit_y = None
-
-    # Find the first object hit (if any), and the wall hit.
     while distance <= max_dist:
-        xi, yi = int(x), int(y)
-        # Check objects (if any), but only if not too close (skip self-hit)
-        for obj in objects:
-            dx = obj.x - x
-            dy = obj.y - y
-            obj_dist2 = dx*dx + dy*dy
-            if obj_dist2 < obj.radius * obj.radius:
-                if distance < object_hit_distance:
-                    object_hit = obj
-                    object_hit_distance = distance
-                    object_hit_x = x
-                    object_hit_y = y
-        # Wall check
         if game_map.is_wall(x, y):
-            hit_wall = True
-            break
+            # Whichever coordinate changed cell on the last step tells us the face.
+            side = 'x' if int(prev_x) != int(x) else 'y'
+            return True, x, y, distance, side
+        prev_x, prev_y = x, y
         x += cos_a * RAY_STEP_SIZE
         y += sin_a * RAY_STEP_SIZE
         distance += RAY_STEP_SIZE
+    return False, x, y, distance, None
 
-    if hit_wall:
-        wall_result = {
-            'hit': True,
-            'hit_x': x,
-            'hit_y': y,
-            'distance': distance,
-        }
+def _dda_wall(x0, y0, cos_a, sin_a, game_map, max_dist):
+    """
+    Exact grid traversal (Amanatides & Woo): visits only the cells the ray
+    crosses. Returns (hit, distance, side) for the first wall cell entered.
+    """
+    if game_map.is_wall(x0, y0):
+        return True, 0.0, None
+    cell_x, cell_y = math.floor(x0), math.floor(y0)
+    # Distance along the ray between two x (resp. y) grid lines.
+    delta_x = abs(1.0 / cos_a) if cos_a != 0 else float('inf')
+    delta_y = abs(1.0 / sin_a) if sin_a != 0 else float('inf')
+    if cos_a < 0:
+        step_x = -1
+        side_x = (x0 - cell_x) * delta_x
     else:
-        wall_result = {
-            'hit': False,
-            'hit_x': x,
-            'hit_y': y,
-            'distance': distance,
-        }
+        step_x = 1
+        side_x = (cell_x + 1 - x0) * delta_x
+    if sin_a < 0:
+        step_y = -1
+        side_y = (y0 - cell_y) * delta_y
+    else:
+        step_y = 1
+        side_y = (cell_y + 1 - y0) * delta_y
+
+    while True:
+        if side_x < side_y:
+            distance = side_x
+            side_x += delta_x
+            cell_x += step_x
+            side = 'x'
+        else:
+            distance = side_y
+            side_y += delta_y
+            cell_y += step_y
+            side = 'y'
+        if distance > max_dist:
+            return False, max_dist, None
+        if game_map.is_wall(cell_x + 0.5, cell_y + 0.5):
+            return True, distance, side
+
+def _sphere_wall(x0, y0, cos_a, sin_a, game_map, max_dist):
+    """
+    Sphere tracing over game_map.distance_field: jumps by the cell's clearance
+    while it is positive and falls back to a single DDA cell step next to
+    walls, so hits are exactly those of _dda_wall.
+    """
+    if game_map.distance_field is None:
+        return _dda_wall(x0, y0, cos_a, sin_a, game_map, max_dist)
+    if game_map.is_wall(x0, y0):
+        return True, 0.0, None
+    step_x = -1 if cos_a < 0 else 1
+    step_y = -1 if sin_a < 0 else 1
+    cell_x, cell_y = math.floor(x0), math.floor(y0)
+    t = 0.0
+    while True:
+        clearance = game_map.clearance(cell_x + 0.5, cell_y + 0.5)
+        if clearance > 0:
+            t += clearance
+            if t > max_dist:
+                return False, max_dist, None
+            new_x = math.floor(x0 + cos_a * t)
+            new_y = math.floor(y0 + sin_a * t)
+            if game_map.is_wall(new_x + 0.5, new_y + 0.5):
+                # Landed exactly on a wall face.
+                return True, t, 'x' if new_x != cell_x else 'y'
+            cell_x, cell_y = new_x, new_y
+            continue
+        # Within a cell of a wall: advance to the next cell boundary.
+        x = x0 + cos_a * t
+        y = y0 + sin_a * t
+        to_x = ((cell_x + (cos_a > 0)) - x) / cos_a if cos_a != 0 else float('inf')
+        to_y = ((cell_y + (sin_a > 0)) - y) / sin_a if sin_a != 0 else float('inf')
+        if to_x < to_y:
+            t += max(to_x, 0.0)
+            cell_x += step_x
+            side = 'x'
+        else:
+            t += max(to_y, 0.0)
+            cell_y += step_y
+            side = 'y'
+        if t > max_dist:
+            return False, max_dist, None
+        if game_map.is_wall(cell_x + 0.5, cell_y + 0.5):
+            return True, t, side
+
+def _object_candidates(x0, y0, objects, view_angle=None, half_fov=None):
+    """
+    Broadphase: returns (obj, dx, dy, bearing, half_width) for every object
+    within ray range, where a ray hits the circle iff its angle is within
+    half_width of bearing. If view_angle/half_fov are given, objects outside
+    the view wedge are dropped as well.
+    """
+    candidates = []
+    for obj in objects:
+        dx = obj.x - x0
+        dy = obj.y - y0
+        r = obj.radius
+        d2 = dx*dx + dy*dy
+        if d2 < r*r:
+            # Viewer is inside the circle: every ray hits it at distance 0.
+            candidates.append((obj, dx, dy, 0.0, math.pi))
+            continue
+        d = math.sqrt(d2)
+        if d - r > RAY_MAX_DISTANCE:
+            continue
+        bearing = math.atan2(dy, dx)
+        half_width = math.asin(r / d) if d > 0 else math.pi
+        if view_angle is not None:
+            off = (bearing - view_angle + math.pi) % (2 * math.pi) - math.pi
+            if abs(off) > half_fov + half_width:
+                continue
+        candidates.append((obj, dx, dy, bearing, half_width))
+    return candidates
+
+def _first_object_hit(angle, cos_a, sin_a, candidates, max_t, quantum=None):
+    """
+    Closed-form ray vs circle against the broadphase candidates. With a
+    quantum, entry distances are snapped up to the marcher's sample grid
+    (and circles slipping between two samples are missed) like the legacy
+    fixed-step loop did.
+    """
+    object_hit = None
+    object_hit_distance = float('inf')
+    for obj, dx, dy, bearing, half_width in candidates:
+        off = (angle - bearing + math.pi) % (2 * math.pi) - math.pi
+        if abs(off) > half_width:
+            continue
+        r = obj.radius
+        c = dx*dx + dy*dy - r*r
+        if c < 0:
+            t = 0.0
+        else:
+            b = dx*cos_a + dy*sin_a
+            root = math.sqrt(max(b*b - c, 0.0))
+            t = b - root
+            if quantum:
+                t = math.ceil(t / quantum - 1e-9) * quantum
+                if t >= b + root:
+                    continue
+        if t <= max_t and t < object_hit_distance:
+            object_hit = obj
+            object_hit_distance = t
+    return object_hit, object_hit_distance
+
+def _make_result(hit_wall, x, y, distance, side,
+                 object_hit, object_hit_distance, object_hit_x, object_hit_y):
+    wall_result = {
+        'hit': hit_wall,
+        'hit_x': x,
+        'hit_y': y,
+        'distance': distance,
+        'side': side,
+    }
     wall_result['object_hit'] = object_hit
     wall_result['object_hit_distance'] = object_hit_distance if object_hit is not None else None
     wall_result['object_hit_x'] = object_hit_x
     wall_result['object_hit_y'] = object_hit_y
-    return wall_result
\ No newline at end of file
+    return wall_result
+
+
+# --- Vectorized engine ---
+
+def raycast_batch(player_x, player_y, player_angle, fov, num_rays, game_map, objects=[]):
+    """
+    Casts all rays of the FOV in one array computation (exact DDA over
+    game_map.occupancy). Returns a dict of contiguous arrays, one entry per ray:
+      'hit' (bool), 'hit_x', 'hit_y', 'distance', 'ray_angle' (float32),
+      'side' (int8: 0 = x face, 1 = y face, -1 = none),
+      'object_index' (int32 index into objects, -1 = none),
+      'object_distance' (float32, inf if no object hit),
+      'object_x', 'object_y' (float32, nan if no object hit)
+    With RAY_ENGINE == 'step' the legacy marcher is used and converted.
+    """
+    if RAY_ENGINE == 'step':
+        return rays_to_batch(raycast_2d(player_x, player_y, player_angle, fov, num_rays, game_map, objects), objects)
+    angles = player_angle - fov / 2 + np.arange(num_rays) * (fov / max(num_rays - 1, 1))
+    xs = np.full(num_rays, player_x, dtype=np.float64)
+    ys = np.full(num_rays, player_y, dtype=np.float64)
+    return cast_rays(xs, ys, angles, game_map.occupancy, objects)
+
+def raycast_many(poses, fov, num_rays, game_map, objects=[], ignore=None):
+    """
+    Casts num_rays rays for each of N viewers in one batched pass.
+    poses: (N, 3) array of x, y, angle. ignore: optional (N,) object index
+    each viewer cannot hit (e.g. its own body in objects), -1 for none.
+    Returns the raycast_batch dict with every array shaped (N, num_rays).
+    """
+    poses = np.asarray(poses, dtype=np.float64).reshape(-1, 3)
+    n = poses.shape[0]
+    if ignore is None:
+        ignore = np.full(n, -1)
+    ignore = np.asarray(ignore)
+    if RAY_ENGINE == 'step':
+        rows = []
+        for (x, y, angle), skip in zip(poses, ignore):
+            visible = [obj for i, obj in enumerate(objects) if i != skip]
+            rows.append(rays_to_batch(raycast_2d(x, y, angle, fov, num_rays, game_map, visible), objects))
+        return {k: np.stack([row[k] for row in rows]) for k in rows[0]}
+    offsets = -fov / 2 + np.arange(num_rays) * (fov / max(num_rays - 1, 1))
+    xs = np.repeat(poses[:, 0], num_rays)
+    ys = np.repeat(poses[:, 1], num_rays)
+    angles = (poses[:, 2:3] + offsets).ravel()
+    batch = cast_rays(xs, ys, angles, game_map.occupancy, objects, ignore=np.repeat(ignore, num_rays))
+    return {k: v.reshape(n, num_rays) for k, v in batch.items()}
+
+def cast_rays(xs, ys, angles, occupancy, objects=[], max_dist=RAY_MAX_DISTANCE, ignore=None):
+    """
+    Vectorized kernel: one ray per (xs[i], ys[i], angles[i]) over a bool wall
+    grid. ignore: optional per-ray object index that ray cannot hit.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    angles = np.asarray(angles, dtype=np.float64)
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    distance, hit, side = _dda_wall_batch(xs, ys, cos_a, sin_a, occupancy, max_dist)
+    batch = {
+        'hit': hit,
+        'hit_x': (xs + cos_a * distance).astype(np.float32),
+        'hit_y': (ys + sin_a * distance).astype(np.float32),
+        'distance': distance.astype(np.float32),
+        'ray_angle': angles.astype(np.float32),
+        'side': side,
+    }
+    batch.update(object_hits(xs, ys, angles, distance, objects, ignore))
+    return batch
+
+def object_hits(xs, ys, angles, wall_distance, objects=[], ignore=None):
+    """
+    The object_* fields of a batch result, for rays whose wall distances are
+    already known (e.g. cached): closed-form hits clipped to wall_distance.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    angles = np.asarray(angles, dtype=np.float64)
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    wall_distance = np.asarray(wall_distance, dtype=np.float64)
+    object_index, object_distance = _ray_circles_batch(xs, ys, cos_a, sin_a, wall_distance, objects, ignore)
+    object_d = np.where(object_index >= 0, object_distance, np.nan)
+    return {
+        'object_index': object_index,
+        'object_distance': object_distance.astype(np.float32),
+        'object_x': (xs + cos_a * object_d).astype(np.float32),
+        'object_y': (ys + sin_a * object_d).astype(np.float32),
+    }
+
+def _is_wall_cells(occupancy, cx, cy):
+    h, w = occupancy.shape
+    inside = (cx >= 0) & (cy >= 0) & (cx < w) & (cy < h)
+    walls = np.ones(cx.shape, dtype=bool)
+    walls[inside] = occupancy[cy[inside], cx[inside]]
+    return walls
+
+def _dda_wall_batch(xs, ys, cos_a, sin_a, occupancy, max_dist):
+    n = xs.shape[0]
+    distance = np.full(n, max_dist, dtype=np.float64)
+    hit = np.zeros(n, dtype=bool)
+    side = np.full(n, -1, dtype=np.int8)
+
+    cell_x = np.floor(xs).astype(np.int64)
+    cell_y = np.floor(ys).astype(np.int64)
+    with np.errstate(divide='ignore'):
+        delta_x = np.abs(1.0 / cos_a)
+        delta_y = np.abs(1.0 / sin_a)
+    step_x = np.where(cos_a < 0, -1, 1)
+    step_y = np.where(sin_a < 0, -1, 1)
+    frac_x = np.where(cos_a < 0, xs - cell_x, cell_x + 1 - xs)
+    frac_y = np.where(sin_a < 0, ys - cell_y, cell_y + 1 - ys)
+    with np.errstate(invalid='ignore'):
+        # 0 * inf only happens for axis-parallel rays sitting on a grid line
+        side_x = np.nan_to_num(frac_x * delta_x, nan=np.inf)
+        side_y = np.nan_to_num(frac_y * delta_y, nan=np.inf)
+
+    inside_wall = _is_wall_cells(occupancy, cell_x, cell_y)
+    hit[inside_wall] = True
+    distance[inside_wall] = 0.0
+
+    # Only the still-travelling rays are kept in the working set.
+    active = np.flatnonzero(~inside_wall)
+    cell_x, cell_y = cell_x[active], cell_y[active]
+    side_x, side_y = side_x[active], side_y[active]
+    delta_x, delta_y = delta_x[active], delta_y[active]
+    step_x, step_y = step_x[active], step_y[active]
+    while active.size:
+        along_x = side_x < side_y
+        dist = np.where(along_x, side_x, side_y)
+        side_x = np.where(along_x, side_x + delta_x, side_x)
+        side_y = np.where(along_x, side_y, side_y + delta_y)
+        cell_x = np.where(along_x, cell_x + step_x, cell_x)
+        cell_y = np.where(along_x, cell_y, cell_y + step_y)
+
+        too_far = dist > max_dist
+        walls = ~too_far & _is_wall_cells(occupancy, cell_x, cell_y)
+        done_idx = active[walls]
+        hit[done_idx] = True
+        distance[done_idx] = dist[walls]
+        side[done_idx] = np.where(along_x[walls], 0, 1)
+
+        keep = ~(walls | too_far)
+        active = active[keep]
+        cell_x, cell_y = cell_x[keep], cell_y[keep]
+        side_x, side_y = side_x[keep], side_y[keep]
+        delta_x, delta_y = delta_x[keep], delta_y[keep]
+        step_x, step_y = step_x[keep], step_y[keep]
+    return distance, hit, side
+
+def ray_circle_distance(xs, ys, cos_a, sin_a, cx, cy, radius, max_t=np.inf):
+    """
+    Elementwise (broadcasting) closed-form ray vs circle: distance along each
+    unit ray to the first point inside its circle, 0 if the ray starts
+    inside, inf if it misses or the hit is beyond max_t.
+    """
+    dx = cx - xs
+    dy = cy - ys
+    c = dx*dx + dy*dy - radius*radius
+    b = dx*cos_a + dy*sin_a
+    disc = b*b - c
+    with np.errstate(invalid='ignore'):
+        t = np.where(c < 0, 0.0, b - np.sqrt(disc))
+    valid = (c < 0) | ((b > 0) & (disc >= 0))
+    return np.where(valid & (t <= max_t), t, np.inf)
+
+def _ray_circles_batch(xs, ys, cos_a, sin_a, wall_distance, objects, ignore=None):
+    """
+    Closed-form first hit of every ray against the object circles. The
+    broadphase of _object_candidates, batched: per ray origin, objects out of
+    range are dropped, and each remaining object is only paired with the
+    rays inside its angular half-width, so the narrow phase costs
+    O(overlapping pairs) rather than O(rays * objects).
+    """
+    n = xs.shape[0]
+    object_index = np.full(n, -1, dtype=np.int32)
+    object_distance = np.full(n, np.inf)
+    if not objects or not n:
+        return object_index, object_distance
+    obj_x = np.array([obj.x for obj in objects], dtype=np.float64)
+    obj_y = np.array([obj.y for obj in objects], dtype=np.float64)
+    obj_r = np.array([obj.radius for obj in objects], dtype=np.float64)
+    ray, obj = _ray_object_pairs(xs, ys, cos_a, sin_a, wall_distance, obj_x, obj_y, obj_r)
+    if ignore is not None:
+        keep = ignore[ray] != obj
+        ray, obj = ray[keep], obj[keep]
+    t = ray_circle_distance(xs[ray], ys[ray], cos_a[ray], sin_a[ray],
+                            obj_x[obj], obj_y[obj], obj_r[obj], wall_distance[ray])
+    hit = np.isfinite(t)
+    ray, obj, t = ray[hit], obj[hit], t[hit]
+    if ray.size:
+        # Nearest object per ray, lowest index on ties (as argmin over all objects)
+        order = np.lexsort((obj, t, ray))
+        first = order[np.r_[True, ray[order[1:]] != ray[order[:-1]]]]
+        object_index[ray[first]] = obj[first]
+        object_distance[ray[first]] = t[first]
+    return object_index, object_distance
+
+def _ray_object_pairs(xs, ys, cos_a, sin_a, wall_distance, obj_x, obj_y, obj_r):
+    """(ray, object) index pairs that pass the range and angular-width tests."""
+    two_pi = 2 * math.pi
+    # Rays from one origin (a viewer's fan) share its per-object bearings.
+    origins, group = np.unique(np.stack([xs, ys], axis=1), axis=0, return_inverse=True)
+    group = group.ravel()
+    reach = np.zeros(len(origins))
+    np.maximum.at(reach, group, wall_distance)
+    dx = obj_x[None, :] - origins[:, 0:1]
+    dy = obj_y[None, :] - origins[:, 1:2]
+    d = np.hypot(dx, dy)
+    g, m = np.nonzero(d - obj_r[None, :] <= reach[:, None])
+    if not g.size:
+        return g, m
+    d, r = d[g, m], obj_r[m]
+    bearing = np.arctan2(dy[g, m], dx[g, m]) % two_pi
+    with np.errstate(divide='ignore'):
+        # A viewer inside the circle hits it with every ray
+        half = np.where(d > r, np.arcsin(np.minimum(r / d, 1.0)), math.pi) + 1e-9
+    lo = bearing - half
+    hi = bearing + half
+    # Windows are clipped to [0, 2pi); the parts past either end wrap around.
+    low_wrap = lo < 0
+    high_wrap = hi > two_pi
+    win_g = np.concatenate([g, g[low_wrap], g[high_wrap]])
+    win_m = np.concatenate([m, m[low_wrap], m[high_wrap]])
+    win_lo = np.concatenate([np.maximum(lo, 0), lo[low_wrap] + two_pi, np.zeros(high_wrap.sum())])
+    win_hi = np.concatenate([np.minimum(hi, two_pi), np.full(low_wrap.sum(), two_pi), hi[high_wrap] - two_pi])
+    # Rays sorted by (origin, angle); each window is then one searchsorted range.
+    span = two_pi + 1
+    keys = group * span + np.arctan2(sin_a, cos_a) % two_pi
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    start = np.searchsorted(keys, win_g * span + win_lo, side='left')
+    count = np.searchsorted(keys, win_g * span + win_hi, side='right') - start
+    total = int(count.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+    return order[np.repeat(start, count) + offsets], np.repeat(win_m, count)
+
+def batch_to_rays(batch, objects=[]):
+    """Adapter: struct-of-arrays result -> legacy list of ray dicts (see raycast_2d)."""
+    rays = []
+    for i in range(len(batch['distance'])):
+        idx = int(batch['object_index'][i])
+        side = int(batch['side'][i])
+        res = {
+            'hit': bool(batch['hit'][i]),
+            'hit_x': float(batch['hit_x'][i]),
+            'hit_y': float(batch['hit_y'][i]),
+            'distance': float(batch['distance'][i]),
+            'side': 'xy'[side] if side >= 0 else None,
+            'object_hit': objects[idx] if idx >= 0 else None,
+            'object_hit_distance': None,
+            'object_hit_x': None,
+            'object_hit_y': None,
+            'ray_angle': float(batch['ray_angle'][i]),
+        }
+        if idx >= 0:
+            res['object_hit_distance'] = float(batch['object_distance'][i])
+            res['object_hit_x'] = float(batch['object_x'][i])
+            res['object_hit_y'] = float(batch['object_y'][i])
+        rays.append(res)
+    return rays
+
+def rays_to_batch(rays, objects=[]):
+    """Adapter: legacy list of ray dicts -> struct-of-arrays result."""
+    index_of = {id(obj): i for i, obj in enumerate(objects)}
+    nan = float('nan')
+    object_index = [index_of[id(r['object_hit'])] if r['object_hit'] is not None else -1 for r in rays]
+    return {
+        'hit': np.array([r['hit'] for r in rays], dtype=bool),
+        'hit_x': np.array([r['hit_x'] for r in rays], dtype=np.float32),
+        'hit_y': np.array([r['hit_y'] for r in rays], dtype=np.float32),
+        'distance': np.array([r['distance'] for r in rays], dtype=np.float32),
+        'ray_angle': np.array([r['ray_angle'] for r in rays], dtype=np.float32),
+        'side': np.array([{'x': 0, 'y': 1}.get(r['side'], -1) for r in rays], dtype=np.int8),
+        'object_index': np.array(object_index, dtype=np.int32),
+        'object_distance': np.array([r['object_hit_distance'] if r['object_hit'] is not None else np.inf
+                                     for r in rays], dtype=np.float32),
+        'object_x': np.array([r['object_hit_x'] if r['object_hit'] is not None else nan for r in rays], dtype=np.float32),
+        'object_y': np.array([r['object_hit_y'] if r['object_hit'] is not None else nan for r in rays], dtype=np.float32),
+    }
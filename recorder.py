@@ -0,0 +1,125 @@
+# recorder.py
+#
+# Headless episode recording: render through SDL's dummy video driver,
+# grab frames with surfarray and encode them on a background thread.
+#
+#   view = HeadlessView()
+#   with EpisodeRecorder('episode_0001.mp4') as rec:   # or .zip for a frame archive
+#       ...
+#       rec.capture(view.render(env))
+
+import io
+import os
+import queue
+import threading
+import zipfile
+import numpy as np
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_NAME, FONT_SIZE
+
+def init_headless():
+    """Initialise pygame without a display; call before any other pygame use."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    pygame.init()
+    return pygame
+
+class HeadlessView:
+    """Offscreen surface, font and Renderer for HiderHunterEnv.render."""
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        pygame = init_headless()
+        from renderer import Renderer
+        self.pygame = pygame
+        self.surface = pygame.display.set_mode((width, height))
+        self.font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+        self.renderer = Renderer(self.surface, 0, 0)
+
+    def render(self, env, extra=None):
+        env.render(self.renderer, self.font, extra=extra)
+        return self.surface
+
+class ZipFrameWriter:
+    """Frame archive: one .npy per frame in a zip, readable with load_frames()."""
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        self.count = 0
+
+    def append_data(self, frame):
+        buf = io.BytesIO()
+        np.save(buf, frame)
+        self.zip.writestr(f'{self.count:06d}.npy', buf.getvalue())
+        self.count += 1
+
+    def close(self):
+        self.zip.close()
+
+def load_frames(path):
+    """Yield the (height, width, 3) uint8 frames of a ZipFrameWriter archive in order."""
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            yield np.load(io.BytesIO(archive.read(name)))
+
+def _open_writer(path, fps):
+    if path.endswith('.zip'):
+        return ZipFrameWriter(path)
+    try:
+        import imageio
+    except ImportError:
+        raise ImportError(f'Encoding {path} needs imageio (and imageio-ffmpeg for video); '
+                          'record to a .zip frame archive instead') from None
+    return imageio.get_writer(path, fps=fps)
+
+class EpisodeRecorder:
+    """
+    capture() copies the surface into a numpy frame and puts it on a bounded
+    queue; a background thread encodes frames to path (.zip frame archive,
+    or any format imageio can write, e.g. .mp4 or .gif). When the queue is
+    full the frame is dropped (counted in .dropped) unless block=True, so a
+    slow encoder never stalls the simulation.
+    """
+    def __init__(self, path, fps=30, max_queue=64, block=False):
+        self.path = path
+        self.block = block
+        self.frames = queue.Queue(maxsize=max_queue)
+        self.captured = 0
+        self.dropped = 0
+        self.error = None
+        self._writer = _open_writer(path, fps)
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def _encode(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue  # Keep draining so capture() never blocks forever
+            try:
+                # surfarray is (width, height, 3); encoders want rows first
+                self._writer.append_data(np.ascontiguousarray(frame.transpose(1, 0, 2)))
+            except Exception as e:
+                self.error = e
+
+    def capture(self, surface):
+        import pygame
+        frame = pygame.surfarray.array3d(surface)
+        try:
+            self.frames.put(frame, block=self.block)
+            self.captured += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Wait for queued frames to be encoded and finish the file."""
+        self.frames.put(None)
+        self._thread.join()
+        self._writer.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
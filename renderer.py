@@ -1,9 +1,12 @@
 # renderer.py
 
-import pygame
 import math
+from collections import OrderedDict
+import numpy as np
+import pygame
+from raycaster import rays_to_batch
 from settings import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, VIEW_SCALE,
+    SCREEN_WIDTH, SCREEN_HEIGHT, VIEW_SCALE, RENDER_CHUNK_CELLS, RENDER_CHUNK_CACHE_MB, RAY_FAN_POLYGON_MIN_RAYS,
     COLOR_BG, COLOR_WALL, COLOR_GRID, COLOR_FLOOR,
     COLOR_PLAYER, COLOR_PLAYER_DIR, COLOR_RAY, COLOR_RAY_HIT,
     COLOR_STATIC_SPRITE, COLOR_FAKE_PLAYER, COLOR_NPC_DIR)
@@ -22,37 +25,67 @@ class Renderer:
         self.surface = surface
         self.map_width = map_width
         self.map_height = map_height
+        # Pre-rendered maze tiles, keyed (map_id, chunk_x, chunk_y), LRU order,
+        # capped by pixel bytes (a 16-cell tile at VIEW_SCALE 32 is ~1 MB)
+        self.chunks = OrderedDict()
+        self.chunk_bytes = 0
+        # Hit marker sprites, keyed (color, radius)
+        self.markers = {}
 
-    def draw_2d_view(self, game_map, player, rays, static_sprites, fake_player, font, dt, fps, show_full_map=False):
+    def draw_2d_view(self, game_map, player, rays, static_sprites, fake_players, font, dt, fps,
+                     show_full_map=False, objects=None):
+        """
+        rays: a raycast_batch result whose object_index refers to objects
+        (default static_sprites + fake_players), or a legacy list of ray dicts.
+        """
+        rays, objects = as_ray_batch(rays, static_sprites + fake_players if objects is None else objects)
         self.surface.fill(COLOR_BG)
         if show_full_map:
-            self.draw_full_map(game_map, player, rays, static_sprites, fake_player)
+            self.draw_full_map(game_map, player, rays, objects, static_sprites, fake_players)
         else:
-            self.draw_rays_and_hits(player, rays)
-            self.draw_visible_objects_by_ray(rays, static_sprites, fake_player, player)
+            self.draw_rays(player, rays, objects)
+            self.draw_visible_objects_by_ray(rays, objects, static_sprites, fake_players, player)
             self.draw_player(player)
         # FPS
         fps_surf = font.render(f"FPS: {int(fps)}", True, (230,230,230))
         self.surface.blit(fps_surf, (8, 8))
 
-    def draw_full_map(self, game_map, player, rays, static_sprites, fake_player):
+    def draw_full_map(self, game_map, player, rays, objects, static_sprites, fake_players):
         self.draw_grid(game_map, player)
         self.draw_all_sprites(static_sprites, player)
-        self.draw_fake_player(fake_player, player)
+        for fake_player in fake_players:
+            self.draw_fake_player(fake_player, player)
         self.draw_player(player)
-        self.draw_all_rays(player, rays)
+        self.draw_rays(player, rays, objects)
 
     def draw_grid(self, game_map, player):
-        grid = game_map.get_grid()
-        for y, row in enumerate(grid):
-            for x, cell in enumerate(row):
-                # Draw each cell at its map location
-                sx, sy = map_to_screen(x + 0.5, y + 0.5, player)
-                rect = pygame.Rect(
-                    sx - VIEW_SCALE//2, sy - VIEW_SCALE//2, VIEW_SCALE, VIEW_SCALE)
-                color = COLOR_FLOOR if cell == ' ' else COLOR_WALL
-                pygame.draw.rect(self.surface, color, rect)
-                pygame.draw.rect(self.surface, COLOR_GRID, rect, 1)
+        """Blit the cached maze chunks that overlap the screen."""
+        n = RENDER_CHUNK_CELLS
+        half_w = SCREEN_WIDTH / 2 / VIEW_SCALE
+        half_h = SCREEN_HEIGHT / 2 / VIEW_SCALE
+        x0 = max(int((player.x - half_w) // n), 0)
+        x1 = min(int((player.x + half_w) // n), (game_map.width - 1) // n)
+        y0 = max(int((player.y - half_h) // n), 0)
+        y1 = min(int((player.y + half_h) // n), (game_map.height - 1) // n)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                # Floor, not map_to_screen's truncation: chunks can start off screen
+                sx = math.floor((cx * n - player.x) * VIEW_SCALE + SCREEN_WIDTH // 2)
+                sy = math.floor((cy * n - player.y) * VIEW_SCALE + SCREEN_HEIGHT // 2)
+                self.surface.blit(self._chunk(game_map, cx, cy), (sx, sy))
+
+    def _chunk(self, game_map, cx, cy):
+        key = (game_map.map_id, cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        chunk = render_chunk(game_map.occupancy, cx, cy)
+        self.chunks[key] = chunk
+        self.chunk_bytes += surface_bytes(chunk)
+        while self.chunk_bytes > RENDER_CHUNK_CACHE_MB << 20 and len(self.chunks) > 1:
+            self.chunk_bytes -= surface_bytes(self.chunks.popitem(last=False)[1])
+        return chunk
 
     def draw_player(self, player):
         px, py = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
@@ -74,70 +107,115 @@ class Renderer:
         ndy = int(fake_player.radius * 2.5 * VIEW_SCALE * math.sin(fake_player.target_dir))
         pygame.draw.line(self.surface, COLOR_NPC_DIR, (sx, sy), (sx + ndx, sy + ndy), 2)
 
-    def draw_rays_and_hits(self, player, rays):
-        px, py = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
-        for ray in rays:
-            xend, yend = None, None
-            # Draw up to first hit (object or wall, whichever closer)
-            if ray['object_hit'] is not None and (not ray['hit'] or ray['object_hit_distance'] < ray['distance']):
-                xend, yend = ray['object_hit_x'], ray['object_hit_y']
-            elif ray['hit']:
-                xend, yend = ray['hit_x'], ray['hit_y']
-            if xend is not None and yend is not None:
-                hx, hy = map_to_screen(xend, yend, player)
-                pygame.draw.line(self.surface, COLOR_RAY, (px, py), (hx, hy), 1)
-            # Wall hit marker
-            if ray['hit']:
-                hx, hy = map_to_screen(ray['hit_x'], ray['hit_y'], player)
-                pygame.draw.circle(self.surface, COLOR_RAY_HIT, (hx, hy), 5)
-            # Object hit marker
-            if ray['object_hit'] is not None and (not ray['hit'] or ray['object_hit_distance'] < ray['distance']):
-                ox, oy = map_to_screen(ray['object_hit_x'], ray['object_hit_y'], player)
-                color = get_obj_color(ray['object_hit'])
-                pygame.draw.circle(self.surface, color, (ox, oy), int(ray['object_hit'].radius * VIEW_SCALE)+2)
-
-    def draw_visible_objects_by_ray(self, rays, sprites, fake_player, player):
+    def draw_rays(self, player, rays, objects):
+        """
+        Ray fan plus wall and object hit markers from a struct-of-arrays
+        raycast result. objects: the list rays['object_index'] refers to.
+        Below RAY_FAN_POLYGON_MIN_RAYS this is visually equivalent to the
+        per-ray-dict loop it replaced (float32 hit points can move an endpoint
+        by a pixel): screen positions are computed for all rays at once, then
+        each ray draws its line (center to end) and its markers in ray order.
+        Denser fans are filled as one polygon instead.
+        """
+        cx, cy = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+        hit = rays['hit']
+        obj_index = rays['object_index']
+        # Draw up to first hit (object or wall, whichever closer)
+        obj_front = (obj_index >= 0) & (~hit | (rays['object_distance'] < rays['distance']))
+        end_x = np.where(obj_front, rays['object_x'], rays['hit_x'])
+        end_y = np.where(obj_front, rays['object_y'], rays['hit_y'])
+        wall_marker = self._marker(COLOR_RAY_HIT, 5)
+        if len(hit) >= RAY_FAN_POLYGON_MIN_RAYS:
+            # Denser than the pixels it covers: fill the fan instead of drawing
+            # every line (rays that hit nothing close it at max range), then
+            # all markers on top. Looks the same, but not per-ray pixel output.
+            ends = self._to_screen(end_x, end_y, player)
+            pygame.draw.polygon(self.surface, COLOR_RAY, [(cx, cy)] + ends.tolist())
+            walls = self._to_screen(rays['hit_x'][hit], rays['hit_y'][hit], player) - 5
+            self.surface.blits([(wall_marker, pos) for pos in walls.tolist()], doreturn=False)
+            front = np.flatnonzero(obj_front)
+            pts = self._to_screen(rays['object_x'][front], rays['object_y'][front], player)
+            self.surface.blits([self._object_marker(objects[i], ox, oy)
+                                for i, (ox, oy) in zip(obj_index[front].tolist(), pts.tolist())], doreturn=False)
+            return
+        ends = self._to_screen(end_x, end_y, player).tolist()
+        walls = (self._to_screen(rays['hit_x'], rays['hit_y'], player) - 5).tolist()
+        # Rays without an object in front get a dummy position (nan does not cast to int)
+        pts = self._to_screen(np.where(obj_front, rays['object_x'], 0), np.where(obj_front, rays['object_y'], 0),
+                              player).tolist()
+        drawn = (obj_front | hit).tolist()
+        front_index = np.where(obj_front, obj_index, -1).tolist()
+        for i, wall in enumerate(hit.tolist()):
+            if drawn[i]:
+                pygame.draw.line(self.surface, COLOR_RAY, (cx, cy), ends[i], 1)
+            if wall:
+                self.surface.blit(wall_marker, walls[i])
+            if front_index[i] >= 0:
+                self.surface.blit(*self._object_marker(objects[front_index[i]], *pts[i]))
+
+    def _object_marker(self, obj, ox, oy):
+        """(sprite, position) of the hit marker for obj at screen point (ox, oy)."""
+        r = int(obj.radius * VIEW_SCALE) + 2
+        return self._marker(get_obj_color(obj), r), (ox - r, oy - r)
+
+    def _to_screen(self, mx, my, player):
+        """map_to_screen for arrays: (n, 2) int pixel coordinates."""
+        # float64 like map_to_screen's Python floats, so both round the same way
+        sx = ((np.asarray(mx, dtype=np.float64) - player.x) * VIEW_SCALE + SCREEN_WIDTH // 2).astype(np.int64)
+        sy = ((np.asarray(my, dtype=np.float64) - player.y) * VIEW_SCALE + SCREEN_HEIGHT // 2).astype(np.int64)
+        return np.stack([sx, sy], axis=1)
+
+    def _marker(self, color, radius):
+        """Pre-rendered filled circle, blitted at (x - radius, y - radius)."""
+        key = (tuple(color), radius)
+        sprite = self.markers.get(key)
+        if sprite is None:
+            # Colorkeyed rather than per-pixel alpha: much cheaper to blit
+            sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+            key_color = (255, 0, 255) if tuple(color) != (255, 0, 255) else (0, 0, 0)
+            sprite.fill(key_color)
+            sprite.set_colorkey(key_color)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            self.markers[key] = sprite
+        return sprite
+
+    def draw_visible_objects_by_ray(self, rays, objects, sprites, fake_players, player):
         # For each object, if any ray's object_hit is this object, show it.
-        visible_sprites = set()
-        visible_fake_player = False
-        for ray in rays:
-            obj = ray.get('object_hit')
-            if obj is None:
-                continue
-            if obj is fake_player:
-                visible_fake_player = True
+        npc_ids = {id(p) for p in fake_players}
+        hit_index = rays['object_index']
+        for i in np.unique(hit_index[hit_index >= 0]).tolist():
+            obj = objects[i]
+            if id(obj) in npc_ids:
+                self.draw_fake_player(obj, player)
             else:
-                visible_sprites.add(obj)
-        # Draw sprites
-        for obj in visible_sprites:
-            sx, sy = map_to_screen(obj.x, obj.y, player)
-            pygame.draw.circle(self.surface, COLOR_STATIC_SPRITE, (sx, sy), int(obj.radius * VIEW_SCALE))
-        # Draw fake player
-        if visible_fake_player:
-            fx, fy = map_to_screen(fake_player.x, fake_player.y, player)
-            pygame.draw.circle(self.surface, COLOR_FAKE_PLAYER, (fx, fy), int(fake_player.radius * VIEW_SCALE))
-            ndx = int(fake_player.radius * 2.5 * VIEW_SCALE * math.cos(fake_player.target_dir))
-            ndy = int(fake_player.radius * 2.5 * VIEW_SCALE * math.sin(fake_player.target_dir))
-            pygame.draw.line(self.surface, COLOR_NPC_DIR, (fx, fy), (fx + ndx, fy + ndy), 2)
-
-    def draw_all_rays(self, player, rays):
-        px, py = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
-        for ray in rays:
-            xend, yend = None, None
-            if ray['object_hit'] is not None and (not ray['hit'] or ray['object_hit_distance'] < ray['distance']):
-                xend, yend = ray['object_hit_x'], ray['object_hit_y']
-            elif ray['hit']:
-                xend, yend = ray['hit_x'], ray['hit_y']
-            if xend is not None and yend is not None:
-                hx, hy = map_to_screen(xend, yend, player)
-                pygame.draw.line(self.surface, COLOR_RAY, (px, py), (hx, hy), 1)
-            if ray['hit']:
-                hx, hy = map_to_screen(ray['hit_x'], ray['hit_y'], player)
-                pygame.draw.circle(self.surface, COLOR_RAY_HIT, (hx, hy), 5)
-            if ray['object_hit'] is not None and (not ray['hit'] or ray['object_hit_distance'] < ray['distance']):
-                ox, oy = map_to_screen(ray['object_hit_x'], ray['object_hit_y'], player)
-                color = get_obj_color(ray['object_hit'])
-                pygame.draw.circle(self.surface, color, (ox, oy), int(ray['object_hit'].radius * VIEW_SCALE)+2)
+                sx, sy = map_to_screen(obj.x, obj.y, player)
+                pygame.draw.circle(self.surface, COLOR_STATIC_SPRITE, (sx, sy), int(obj.radius * VIEW_SCALE))
+
+def render_chunk(occupancy, cx, cy, n=RENDER_CHUNK_CELLS, scale=VIEW_SCALE):
+    """
+    Surface with the n x n cells of chunk (cx, cy): floor/wall fill and a
+    one-pixel grid outline per cell, as draw_grid used to draw cell by cell.
+    """
+    cells = occupancy[cy * n:(cy + 1) * n, cx * n:(cx + 1) * n]
+    colors = np.where(cells[..., None], np.array(COLOR_WALL, np.uint8), np.array(COLOR_FLOOR, np.uint8))
+    pixels = np.repeat(np.repeat(colors, scale, axis=0), scale, axis=1)
+    edge = np.zeros(scale, dtype=bool)
+    edge[[0, -1]] = True
+    pixels[np.tile(edge, cells.shape[0]), :] = COLOR_GRID
+    pixels[:, np.tile(edge, cells.shape[1])] = COLOR_GRID
+    surface = pygame.surfarray.make_surface(pixels.transpose(1, 0, 2))
+    # Match the display format for fast blits when a display exists
+    return surface.convert() if pygame.display.get_surface() is not None else surface
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def as_ray_batch(rays, objects):
+    """(batch, objects) for either result format; list input is converted with its own object list."""
+    if isinstance(rays, dict):
+        return rays, objects
+    hit_objects = list({id(r['object_hit']): r['object_hit'] for r in rays if r['object_hit'] is not None}.values())
+    return rays_to_batch(rays, hit_objects), hit_objects
 
 def get_obj_color(obj):
     from settings import COLOR_STATIC_SPRITE, COLOR_FAKE_PLAYER
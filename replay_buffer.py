@@ -0,0 +1,205 @@
+# replay_buffer.py
+
+import numpy as np
+
+class ReplayBuffer:
+    """
+    Fixed-size ring buffer of transitions stored in preallocated arrays.
+    Sampling gathers a whole batch with one fancy-index per field.
+    """
+    def __init__(self, capacity, obs_dim, seed=None):
+        self.capacity = capacity
+        self.obs_dim = obs_dim
+        self.obs = np.zeros((capacity, obs_dim), dtype=np.float32)
+        self.next_obs = np.zeros((capacity, obs_dim), dtype=np.float32)
+        self.act = np.zeros(capacity, dtype=np.int64)
+        self.rew = np.zeros(capacity, dtype=np.float32)
+        self.done = np.zeros(capacity, dtype=np.float32)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, obs, act, rew, next_obs, done):
+        i = self.pos
+        self.obs[i] = obs
+        self.act[i] = act
+        self.rew[i] = rew
+        self.next_obs[i] = next_obs
+        self.done[i] = done
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, obs, act, rew, next_obs, done):
+        """Store n transitions at once; every argument has a leading axis of n."""
+        n = len(act)
+        if n > self.capacity:
+            # Only the newest capacity transitions would survive anyway.
+            obs, act, rew, next_obs, done = (np.asarray(a)[-self.capacity:] for a in (obs, act, rew, next_obs, done))
+            n = self.capacity
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.obs[idx] = obs
+        self.act[idx] = act
+        self.rew[idx] = rew
+        self.next_obs[idx] = next_obs
+        self.done[idx] = done
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample_indices(self, batch_size):
+        return self.rng.integers(self.size, size=batch_size)
+
+    def gather(self, idx):
+        """(obs, act, rew, next_obs, done) arrays for the given indices."""
+        return self.obs[idx], self.act[idx], self.rew[idx], self.next_obs[idx], self.done[idx]
+
+    def sample(self, batch_size):
+        return self.gather(self.sample_indices(batch_size))
+
+    def state_dict(self):
+        """Copies of the filled part of the buffer, for checkpoints."""
+        n = self.size
+        return {'obs': self.obs[:n].copy(), 'act': self.act[:n].copy(), 'rew': self.rew[:n].copy(),
+                'next_obs': self.next_obs[:n].copy(), 'done': self.done[:n].copy(),
+                'pos': self.pos, 'size': n, 'rng': self.rng.bit_generator.state}
+
+    def load_state_dict(self, state):
+        n = state['size']
+        if n > self.capacity or state['obs'].shape[1] != self.obs_dim:
+            raise ValueError(f"Replay state of {n} x {state['obs'].shape[1]} does not fit "
+                             f"a buffer of {self.capacity} x {self.obs_dim}")
+        for name in ('obs', 'act', 'rew', 'next_obs', 'done'):
+            getattr(self, name)[:n] = state[name]
+        self.pos = state['pos'] % self.capacity
+        self.size = n
+        self.rng.bit_generator.state = state['rng']
+
+class SumTree:
+    """
+    Array-backed binary sum-tree over capacity leaves. tree[1] is the root,
+    node i has children 2i and 2i + 1, leaves start at self.base.
+    """
+    def __init__(self, capacity):
+        self.base = 1
+        while self.base < capacity:
+            self.base *= 2
+        self.tree = np.zeros(2 * self.base, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, idx, values):
+        """Set the leaves idx to values and refresh their ancestors, a level at a time."""
+        nodes = np.asarray(idx, dtype=np.int64) + self.base
+        if nodes.size == 0:
+            return
+        self.tree[nodes] = values
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def set(self, i, value):
+        """Scalar update: a plain Python walk beats numpy calls for one leaf."""
+        node = i + self.base
+        tree = self.tree
+        tree[node] = value
+        node //= 2
+        while node >= 1:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def find(self, targets):
+        """Leaf index whose prefix-sum interval contains each target."""
+        targets = np.array(targets, dtype=np.float64)
+        nodes = np.ones(len(targets), dtype=np.int64)
+        while nodes[0] < self.base:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = targets >= left_sum
+            targets -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return nodes - self.base
+
+    def leaves(self, idx):
+        return self.tree[np.asarray(idx) + self.base]
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Proportional prioritized replay (Schaul et al. 2016). Transitions are
+    sampled with probability p_i^alpha / sum p^alpha and come with
+    importance-sampling weights (N * P(i))^-beta normalized by their max.
+    New transitions get the current max priority so each is seen at least once.
+    """
+    def __init__(self, capacity, obs_dim, alpha=0.6, eps=1e-3, seed=None):
+        super().__init__(capacity, obs_dim, seed)
+        self.alpha = alpha
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+        # Times each slot was written; lets update_priorities skip slots
+        # overwritten between sampling and the priority write-back.
+        self.writes = np.zeros(capacity, dtype=np.int64)
+
+    def add(self, obs, act, rew, next_obs, done):
+        i = self.pos
+        super().add(obs, act, rew, next_obs, done)
+        self.tree.set(i, self.max_priority ** self.alpha)
+        self.writes[i] += 1
+
+    def add_batch(self, obs, act, rew, next_obs, done):
+        n = min(len(act), self.capacity)
+        idx = (self.pos + np.arange(n)) % self.capacity
+        super().add_batch(obs, act, rew, next_obs, done)
+        self.tree.update(idx, np.full(n, self.max_priority ** self.alpha))
+        self.writes[idx] += 1
+
+    def sample_indices(self, batch_size):
+        # Stratified: one uniform draw from each of batch_size equal slices of the total.
+        total = self.tree.total()
+        bounds = np.arange(batch_size) * (total / batch_size)
+        targets = bounds + self.rng.random(batch_size) * (total / batch_size)
+        idx = self.tree.find(np.minimum(targets, np.nextafter(total, 0)))
+        # Float round-off can land on an unfilled leaf; fall back to the last filled one.
+        return np.minimum(idx, self.size - 1)
+
+    def weights(self, idx, beta):
+        probs = self.tree.leaves(idx) / self.tree.total()
+        w = (self.size * probs) ** -beta
+        return (w / w.max()).astype(np.float32)
+
+    def state_dict(self):
+        state = super().state_dict()
+        state['priorities'] = self.tree.leaves(np.arange(self.size)).copy()
+        state['max_priority'] = self.max_priority
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.tree = SumTree(self.capacity)
+        if 'priorities' in state:
+            self.tree.update(np.arange(self.size), state['priorities'])
+            self.max_priority = state['max_priority']
+        elif self.size:
+            # Saved from a uniform buffer: start every transition at max priority.
+            self.tree.update(np.arange(self.size), np.full(self.size, self.max_priority ** self.alpha))
+
+    def update_priorities(self, idx, td_errors, writes=None):
+        """
+        Batched priority write after a learning step; td_errors matches idx.
+        writes: self.writes[idx] taken when idx was sampled; slots written
+        since then hold other transitions and are left alone.
+        """
+        idx = np.asarray(idx)
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        if writes is not None:
+            current = self.writes[idx] == writes
+            idx, priorities = idx[current], priorities[current]
+            if not idx.size:
+                return
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities ** self.alpha)
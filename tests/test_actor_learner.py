@@ -0,0 +1,19 @@
+# tests/test_actor_learner.py
+
+import pytest
+from ai_models import DQNAgent
+from actor_learner import ActorLearner
+
+NUM_RAYS = 9
+INPUT_DIM = 2 * NUM_RAYS + 6
+
+@pytest.mark.parametrize('n_actors', [1, 2])
+def test_update_to_data_ratio_is_enforced(n_actors):
+    hider = DQNAgent(INPUT_DIM, 7, device='cpu')
+    hunter = DQNAgent(INPUT_DIM, 7, device='cpu')
+    trainer = ActorLearner(hider, hunter, n_actors=n_actors, envs_per_actor=8, update_to_data=0.25,
+                           map_width=9, map_height=9, num_rays=NUM_RAYS, max_steps=50)
+    trainer.run(3000, log_every=0)
+    ratio = trainer.updates / trainer.env_steps
+    # Actors stay within slack updates (plus the steps already in flight) of the learner
+    assert 0.9 * trainer.update_to_data <= ratio <= trainer.update_to_data + 1e-9
@@ -1,19 +1,57 @@
-import torch
+import argparse
+import os
 import numpy as np
 from ai_env import HiderHunterEnv
 from ai_models import DQNAgent
+from actor_learner import ActorLearner
+from checkpoint import AsyncCheckpointer, agent_state, load_agent_state, load_checkpoint
 
-def train(num_episodes=200, save_every=80):
+def save(checkpointer, hider, hunter, progress, save_memory):
+    """Queue policy exports (read by the play scripts) and a full resumable checkpoint."""
+    state = dict(progress, hider=agent_state(hider, save_memory), hunter=agent_state(hunter, save_memory))
+    checkpointer.save((state['hider']['policy'], 'hider_dqn.pth'),
+                      (state['hunter']['policy'], 'hunter_dqn.pth'),
+                      (state, 'hider_hunter_ckpt.pth'))
+
+def resume_agents(path, hider, hunter):
+    state = load_checkpoint(path, hider.device)
+    load_agent_state(hider, state['hider'])
+    load_agent_state(hunter, state['hunter'])
+    print(f"Resumed from {path}.")
+    return state
+
+def train(num_episodes=200, save_every=80, resume=None, save_memory=False, record_every=0,
+          record_format='zip', offline=None):
+    """
+    record_every: also render every n-th episode headlessly to recordings/episode_NNNN.<record_format>.
+    offline: trajectory log (trajectory_log.py) whose games prefill both replay buffers.
+    """
     env = HiderHunterEnv(map_width=13, map_height=13, num_rays=21)
     input_dim = len(env._get_obs(env.hider, env.hunter))
     n_actions = 7
     hider = DQNAgent(input_dim, n_actions)
     hunter = DQNAgent(input_dim, n_actions)
+    start_ep = resume_agents(resume, hider, hunter)['episode'] if resume else 0
+    if offline:
+        from trajectory_log import TrajectoryLog
+        log = TrajectoryLog(offline)
+        for role, agent in (('hider', hider), ('hunter', hunter)):
+            with agent.memory_lock:
+                added = log.fill_buffer(agent.memory, role)
+            print(f"Loaded {added} {role} transitions from {offline}.")
+    checkpointer = AsyncCheckpointer()
+    view = None
 
-    for ep in range(num_episodes):
+    for ep in range(start_ep, num_episodes):
         obs_h, obs_t = env.reset()
         tot_r_h = 0
         tot_r_t = 0
+        recorder = None
+        if record_every and (ep + 1) % record_every == 0:
+            from recorder import HeadlessView, EpisodeRecorder
+            view = view or HeadlessView()
+            os.makedirs('recordings', exist_ok=True)
+            recorder = EpisodeRecorder(f'recordings/episode_{ep+1:04d}.{record_format}')
         for step in range(340):
             act_h = hider.select(obs_h, n_actions)
             act_t = hunter.select(obs_t, n_actions)
@@ -25,16 +63,64 @@ def train(num_episodes=200, save_every=80):
             tot_r_t += r_t
             hider.update()
             hunter.update()
+            if recorder is not None:
+                recorder.capture(view.render(env, extra=f"Episode {ep+1} step {step+1}"))
             if done:
                 break
+        if recorder is not None:
+            recorder.close()
         print(f"Episode {ep+1}/{num_episodes}: Hider reward={tot_r_h:.1f} Hunter reward={tot_r_t:.1f} Eps {hider.epsilon():.3f}")
         if (ep+1) % save_every == 0:
-            torch.save(hider.policy.state_dict(), f"hider_dqn.pth")
-            torch.save(hunter.policy.state_dict(), f"hunter_dqn.pth")
+            save(checkpointer, hider, hunter, {'episode': ep + 1}, save_memory)
             print("Saved models.")
-    torch.save(hider.policy.state_dict(), f"hider_dqn.pth")
-    torch.save(hunter.policy.state_dict(), f"hunter_dqn.pth")
+    save(checkpointer, hider, hunter, {'episode': num_episodes}, save_memory)
+    checkpointer.close()
     print("Saved models.")
 
+def train_actor_learner(total_steps=400000, n_actors=2, envs_per_actor=16, update_to_data=0.25,
+                        chunk_steps=50000, resume=None, save_memory=False):
+    """Actor/learner variant of train(): rollouts and updates run concurrently."""
+    num_rays = 21
+    input_dim = 2 * num_rays + 6  # Layout of HiderHunterEnv._get_obs
+    n_actions = 7
+    hider = DQNAgent(input_dim, n_actions)
+    hunter = DQNAgent(input_dim, n_actions)
+    # Load before building the trainer: its constructor publishes the weights actors start from
+    state = resume_agents(resume, hider, hunter) if resume else None
+    trainer = ActorLearner(hider, hunter, n_actors=n_actors, envs_per_actor=envs_per_actor,
+                           update_to_data=update_to_data, map_width=13, map_height=13,
+                           num_rays=num_rays, max_steps=300)
+    if state:
+        trainer.env_steps = state.get('env_steps', 0)
+        trainer.updates = state.get('updates', 0)
+        trainer.episodes = state.get('episode', 0)
+    checkpointer = AsyncCheckpointer()
+    start = trainer.env_steps - trainer.env_steps % chunk_steps
+    for target in range(start + chunk_steps, total_steps + chunk_steps, chunk_steps):
+        print(trainer.run(min(target, total_steps)))
+        progress = {'episode': trainer.episodes, 'env_steps': trainer.env_steps,
+                    'updates': trainer.updates}
+        save(checkpointer, hider, hunter, progress, save_memory)
+        print("Saved models.")
+    checkpointer.close()
+
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Train hider and hunter DQN agents')
+    parser.add_argument('--actor-learner', action='store_true',
+                        help='collect rollouts in actor threads while a learner updates concurrently')
+    parser.add_argument('--actors', type=int, default=2)
+    parser.add_argument('--update-to-data', type=float, default=0.25,
+                        help='gradient updates per collected transition (actor-learner mode)')
+    parser.add_argument('--resume', metavar='CKPT', help='continue from a checkpoint, e.g. hider_hunter_ckpt.pth')
+    parser.add_argument('--save-memory', action='store_true', help='include the replay buffers in checkpoints')
+    parser.add_argument('--record-every', type=int, default=0, metavar='N',
+                        help='headlessly record every N-th episode to recordings/ (serial mode)')
+    parser.add_argument('--offline', metavar='LOG', help='prefill the replay buffers from a trajectory log (serial mode)')
+    parser.add_argument('--record-format', default='zip', help="'zip' frame archive, or e.g. 'mp4' (needs imageio)")
+    args = parser.parse_args()
+    if args.actor_learner:
+        train_actor_learner(n_actors=args.actors, update_to_data=args.update_to_data,
+                            resume=args.resume, save_memory=args.save_memory)
+    else:
+        train(resume=args.resume, save_memory=args.save_memory, record_every=args.record_every,
+              record_format=args.record_format, offline=args.offline)
\ No newline at end of file
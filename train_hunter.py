@@ -1,19 +1,31 @@
-import torch
+import argparse
 import numpy as np
 from ai_env import HiderHunterEnv
 from ai_models import DQNAgent
+from checkpoint import AsyncCheckpointer, agent_state, load_agent_state, load_checkpoint
 
 def simple_hider_policy(obs, n_actions):
     # Replace this with DQN hider for advanced scenario if desired!
     return np.random.randint(n_actions)
 
-def train_hunter(num_episodes=1500, save_every=100):
+def save(checkpointer, hunter, episode, save_memory):
+    state = {'episode': episode, 'hunter': agent_state(hunter, save_memory)}
+    checkpointer.save((state['hunter']['policy'], 'hunter_dqn.pth'), (state, 'hunter_ckpt.pth'))
+
+def train_hunter(num_episodes=1500, save_every=100, resume=None, save_memory=False):
     env = HiderHunterEnv(map_width=13, map_height=13, num_rays=21)
     input_dim = len(env._get_obs(env.hider, env.hunter))
     n_actions = 7
     hunter = DQNAgent(input_dim, n_actions)
+    start_ep = 0
+    if resume:
+        state = load_checkpoint(resume, hunter.device)
+        load_agent_state(hunter, state['hunter'])
+        start_ep = state['episode']
+        print(f"Resumed from {resume} at episode {start_ep}.")
+    checkpointer = AsyncCheckpointer()
 
-    for ep in range(num_episodes):
+    for ep in range(start_ep, num_episodes):
         obs_h, obs_t = env.reset()
         tot_r = 0
         for step in range(340):
@@ -28,10 +40,15 @@ def train_hunter(num_episodes=1500, save_every=100):
                 break
         print(f"[HunterTrain] Ep {ep+1}/{num_episodes}: HunterReward={tot_r:.1f}  Eps={hunter.epsilon():.3f}")
         if (ep+1) % save_every == 0:
-            torch.save(hunter.policy.state_dict(), f'hunter_dqn.pth')
+            save(checkpointer, hunter, ep + 1, save_memory)
             print("Saved hunter model.")
-    torch.save(hunter.policy.state_dict(), f'hunter_dqn.pth')
+    save(checkpointer, hunter, num_episodes, save_memory)
+    checkpointer.close()
     print("Saved hunter model.")
 
 if __name__ == "__main__":
-    train_hunter()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Train a DQN hunter against a random hider')
+    parser.add_argument('--resume', metavar='CKPT', help='continue from a checkpoint, e.g. hunter_ckpt.pth')
+    parser.add_argument('--save-memory', action='store_true', help='include the replay buffer in checkpoints')
+    args = parser.parse_args()
+    train_hunter(resume=args.resume, save_memory=args.save_memory)
\ No newline at end of file
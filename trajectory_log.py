@@ -0,0 +1,337 @@
+# trajectory_log.py
+#
+# Append-only, columnar log of hider/hunter games, compact enough to keep
+# every game played:
+#
+#   log = TrajectoryWriter('games.rctraj')
+#   obs_h, obs_t = env.reset(); log.begin_episode(env)
+#   ... = env.step(act_h, act_t); log.log_step(env, act_h, act_t, r_h, r_t, done)
+#   log.close()
+#
+#   python trajectory_log.py info games.rctraj
+#   python trajectory_log.py replay games.rctraj --episode 3 [--out episode_3.zip]
+#
+# Episodes are replayed by re-simulating their actions from the logged maze
+# and start poses, so observations are never stored.
+#
+# Layout (little-endian): magic 'RCTRAJ01', then records appended one after
+# another, each a RECORD header (kind, rows, payload bytes) and its payload,
+# padded to 8 bytes:
+#   'EPIS' : one EPISODE row, then the maze walls as np.packbits (no maze
+#            bytes if maze_episode points at an earlier episode's maze)
+#   'STEP' : rows steps stored column by column in STEP order, each column
+#            padded to 8 bytes
+# A record cut short by a crash is ignored, and dropped on the next append.
+
+import argparse
+import os
+import numpy as np
+from map import Map
+from settings import TRAJECTORY_LOG_FILE
+
+MAGIC = b'RCTRAJ01'
+RECORD = np.dtype([('kind', 'S4'), ('rows', '<i4'), ('nbytes', '<i8')])
+EPISODE = np.dtype([('episode', '<i4'), ('maze_episode', '<i4'), ('height', '<i4'), ('width', '<i4'),
+                    ('maze_index', '<i4'), ('num_rays', '<i4'), ('max_steps', '<i4'),
+                    ('hider_x', '<f8'), ('hider_y', '<f8'), ('hider_angle', '<f8'),
+                    ('hunter_x', '<f8'), ('hunter_y', '<f8'), ('hunter_angle', '<f8')])
+# Poses after the step; float32 is plenty for inspection, replays start from EPISODE's float64 poses.
+STEP = np.dtype([('episode', '<i4'), ('step', '<i4'),
+                 ('hider_x', '<f4'), ('hider_y', '<f4'), ('hider_angle', '<f4'),
+                 ('hunter_x', '<f4'), ('hunter_y', '<f4'), ('hunter_angle', '<f4'),
+                 ('action_hider', 'u1'), ('action_hunter', 'u1'),
+                 ('reward_hider', '<f4'), ('reward_hunter', '<f4'), ('done', 'u1')])
+
+def _align(offset, n=8):
+    return (offset + n - 1) // n * n
+
+def _pad(payload):
+    return payload + bytes(_align(len(payload)) - len(payload))
+
+class TrajectoryWriter:
+    """
+    Buffers steps in a preallocated chunk of chunk_rows rows and appends it
+    to path as one columnar record when full (and on flush/close). Opening an
+    existing log continues it: episode numbers carry on after the last one.
+    """
+    def __init__(self, path=TRAJECTORY_LOG_FILE, chunk_rows=4096):
+        self.path = path
+        self.episode = -1
+        end = None
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            log = TrajectoryLog(path)
+            end = log.end
+            if len(log.episodes):
+                self.episode = int(log.episodes['episode'].max())
+            del log
+        if end is None:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+        else:
+            self.file = open(path, 'r+b')
+            self.file.truncate(end)   # Drop a partial record left by a crash
+            self.file.seek(end)
+        self.chunk = np.zeros(chunk_rows, dtype=STEP)
+        self.rows = 0
+        self.step = 0
+        self._maze_map_id = None
+        self._maze_episode = -1
+
+    def _write_record(self, kind, rows, payload):
+        header = np.array([(kind, rows, len(payload))], dtype=RECORD)
+        self.file.write(header.tobytes() + _pad(payload))
+
+    def begin_episode(self, env):
+        """Log the start of an episode from a just-reset HiderHunterEnv."""
+        self.episode += 1
+        self.step = 0
+        game_map = env.map
+        maze = b''
+        if game_map.map_id != self._maze_map_id:
+            # Envs without a maze pool keep their map; store it once
+            self._maze_map_id = game_map.map_id
+            self._maze_episode = self.episode
+            maze = np.packbits(game_map.occupancy).tobytes()
+        h, t = env.hider, env.hunter
+        row = np.array([(self.episode, self._maze_episode, game_map.height, game_map.width,
+                         getattr(env, 'maze_index', -1), env.num_rays, env.max_steps,
+                         h.x, h.y, h.angle, t.x, t.y, t.angle)], dtype=EPISODE)
+        self._write_record(b'EPIS', 1, row.tobytes() + maze)
+
+    def log_step(self, env, action_hider, action_hunter, reward_hider, reward_hunter, done):
+        """Log one env.step() of the current episode."""
+        h, t = env.hider, env.hunter
+        self.chunk[self.rows] = (self.episode, self.step, h.x, h.y, h.angle, t.x, t.y, t.angle,
+                                 action_hider, action_hunter, reward_hider, reward_hunter, done)
+        self.rows += 1
+        self.step += 1
+        if self.rows == len(self.chunk):
+            self._write_steps()
+
+    def _write_steps(self):
+        if self.rows:
+            steps = self.chunk[:self.rows]
+            payload = b''.join(_pad(steps[name].tobytes()) for name in STEP.names)
+            self._write_record(b'STEP', self.rows, payload)
+            self.rows = 0
+
+    def flush(self):
+        self._write_steps()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryLog:
+    """
+    Lazy reader: opening memory-maps the file and walks the record headers
+    only. Step columns are read chunk by chunk on demand.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{path} is not a trajectory log')
+        episodes = []
+        self.chunks = []   # (offset, rows, first episode, last episode)
+        self._maze_offsets = {}
+        offset = len(MAGIC)
+        while offset + RECORD.itemsize <= len(self.data):
+            record = self.data[offset:offset + RECORD.itemsize].view(RECORD)[0]
+            start = offset + RECORD.itemsize
+            end = _align(start + int(record['nbytes']))
+            if end > len(self.data):
+                break
+            rows = int(record['rows'])
+            if record['kind'] == b'EPIS':
+                row = self.data[start:start + EPISODE.itemsize].view(EPISODE)[0]
+                episodes.append(row)
+                if row['maze_episode'] == row['episode']:
+                    self._maze_offsets[int(row['episode'])] = start + EPISODE.itemsize
+            elif record['kind'] == b'STEP':
+                episode = self.data[start:start + rows * 4].view('<i4')
+                self.chunks.append((start, rows, int(episode[0]), int(episode[-1])))
+            offset = end
+        self.end = offset
+        self.episodes = np.array(episodes, dtype=EPISODE)
+        self._rows = {int(e): i for i, e in enumerate(self.episodes['episode'])}
+        self._map = (None, None)
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def episode(self, episode):
+        """EPISODE row of an episode number."""
+        return self.episodes[self._rows[episode]]
+
+    def chunk(self, i):
+        """Columns of step chunk i as read-only arrays backed by the file."""
+        offset, rows, _, _ = self.chunks[i]
+        columns = {}
+        for name in STEP.names:
+            dtype = STEP.fields[name][0]
+            columns[name] = self.data[offset:offset + rows * dtype.itemsize].view(dtype)
+            offset = _align(offset + rows * dtype.itemsize)
+        return columns
+
+    def iter_chunks(self):
+        for i in range(len(self.chunks)):
+            yield self.chunk(i)
+
+    def steps(self, episode):
+        """All logged steps of an episode, as a dict of column arrays."""
+        parts = []
+        for i, (_, _, first, last) in enumerate(self.chunks):
+            if first <= episode <= last:
+                columns = self.chunk(i)
+                lo, hi = np.searchsorted(columns['episode'], [episode, episode + 1])
+                parts.append({name: col[lo:hi] for name, col in columns.items()})
+        return {name: np.concatenate([p[name] for p in parts]) if parts else np.zeros(0, STEP.fields[name][0])
+                for name in STEP.names}
+
+    def maze(self, episode):
+        """(height, width) bool walls of an episode's maze, True = wall."""
+        row = self.episode(episode)
+        h, w = int(row['height']), int(row['width'])
+        offset = self._maze_offsets[int(row['maze_episode'])]
+        packed = self.data[offset:offset + (h * w + 7) // 8]
+        return np.unpackbits(packed, count=h * w).reshape(h, w).astype(bool)
+
+    def get_map(self, episode):
+        # Consecutive episodes usually share a maze; keep the last Map
+        maze_episode = int(self.episode(episode)['maze_episode'])
+        if self._map[0] != maze_episode:
+            self._map = (maze_episode, Map.from_occupancy(self.maze(episode)))
+        return self._map[1]
+
+    def reset_env(self, env, episode):
+        """Put a HiderHunterEnv at the start of a logged episode; returns (obs_hider, obs_hunter)."""
+        row = self.episode(episode)
+        env.num_rays = int(row['num_rays'])
+        env.max_steps = int(row['max_steps'])
+        env.maze_index = int(row['maze_index'])
+        return env.reset_to(self.get_map(episode),
+                            (float(row['hider_x']), float(row['hider_y']), float(row['hider_angle'])),
+                            (float(row['hunter_x']), float(row['hunter_y']), float(row['hunter_angle'])))
+
+    def replay(self, episode, env=None, check=True):
+        """
+        Re-simulate an episode from its maze, start poses and actions,
+        yielding (obs_pair, next_obs_pair, rewards, done) per step with env
+        left in the post-step state (so it can be rendered). With check, a
+        pose that drifts from the logged one raises ValueError.
+        """
+        if env is None:
+            from ai_env import HiderHunterEnv
+            env = HiderHunterEnv(maze_pool=None)
+        obs = self.reset_env(env, episode)
+        steps = self.steps(episode)
+        for i, (act_h, act_t) in enumerate(zip(steps['action_hider'].tolist(), steps['action_hunter'].tolist())):
+            next_obs, rewards, done = env.step(act_h, act_t)
+            if check and not np.allclose([env.hider.x, env.hider.y, env.hunter.x, env.hunter.y],
+                                         [steps['hider_x'][i], steps['hider_y'][i],
+                                          steps['hunter_x'][i], steps['hunter_y'][i]], atol=1e-3):
+                raise ValueError(f'Episode {episode} diverges from the log at step {i}')
+            yield obs, next_obs, rewards, done
+            obs = next_obs
+
+    def transitions(self, role='hider', episodes=None, env=None):
+        """
+        Offline dataset: yields (obs, act, rew, next_obs, done) arrays per
+        episode for role 'hider' or 'hunter', rebuilt by replay().
+        """
+        if env is None:
+            from ai_env import HiderHunterEnv
+            env = HiderHunterEnv(maze_pool=None)
+        side = {'hider': 0, 'hunter': 1}[role]
+        for episode in (self.episodes['episode'].tolist() if episodes is None else episodes):
+            actions = self.steps(episode)['action_' + role]
+            if not len(actions):
+                continue
+            obs, next_obs, rew, done = [], [], [], []
+            for o, n, r, d in self.replay(episode, env, check=False):
+                obs.append(o[side])
+                next_obs.append(n[side])
+                rew.append(r[side])
+                done.append(d)
+            yield (np.array(obs, dtype=np.float32), actions.astype(np.int64),
+                   np.array(rew, dtype=np.float32), np.array(next_obs, dtype=np.float32),
+                   np.array(done, dtype=np.float32))
+
+    def fill_buffer(self, buffer, role='hider', episodes=None):
+        """Add the logged transitions of role to a ReplayBuffer; returns how many were added."""
+        added = 0
+        for obs, act, rew, next_obs, done in self.transitions(role, episodes):
+            if obs.shape[1] != buffer.obs_dim:
+                raise ValueError(f'Logged observations have {obs.shape[1]} values, '
+                                 f'the buffer expects {buffer.obs_dim}')
+            buffer.add_batch(obs, act, rew, next_obs, done)
+            added += len(act)
+        return added
+
+def show_replay(log, episode, out=None, fps=30):
+    """Re-render an episode in a window, or headlessly into out (see recorder.py)."""
+    from ai_env import HiderHunterEnv
+    if out:
+        from recorder import HeadlessView, EpisodeRecorder
+        view = HeadlessView()
+        recorder = EpisodeRecorder(out, fps=fps, block=True)
+    else:
+        import pygame
+        from renderer import Renderer
+        from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_NAME, FONT_SIZE
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+        renderer = Renderer(screen, 0, 0)
+        clock = pygame.time.Clock()
+    env = HiderHunterEnv(maze_pool=None)
+    total = np.zeros(2)
+    for step, (_, _, rewards, done) in enumerate(log.replay(episode, env)):
+        total += rewards
+        extra = f"Episode {episode} step {step + 1}\nHider {total[0]:.0f} Hunter {total[1]:.0f}"
+        if out:
+            recorder.capture(view.render(env, extra=extra))
+        else:
+            env.render(renderer, font, extra=extra)
+            pygame.display.flip()
+            clock.tick(fps)
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+    if out:
+        recorder.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and replay trajectory logs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help='list the logged episodes')
+    info.add_argument('log', nargs='?', default=TRAJECTORY_LOG_FILE)
+    replay = sub.add_parser('replay', help='re-simulate and render an episode')
+    replay.add_argument('log', nargs='?', default=TRAJECTORY_LOG_FILE)
+    replay.add_argument('--episode', type=int, default=0)
+    replay.add_argument('--fps', type=int, default=30)
+    replay.add_argument('--out', help='record to this file (.zip, or a video format with imageio) instead of a window')
+    args = parser.parse_args()
+    log = TrajectoryLog(args.log)
+    if args.command == 'info':
+        steps = sum(rows for _, rows, _, _ in log.chunks)
+        print(f'{args.log}: {len(log)} episodes, {steps} steps in {len(log.chunks)} chunks, '
+              f'{os.path.getsize(args.log) / 1024:.1f} KiB')
+        for row in log.episodes:
+            s = log.steps(int(row['episode']))
+            print(f"  episode {row['episode']}: {len(s['step'])} steps, maze {row['height']}x{row['width']}"
+                  f" (index {row['maze_index']}), hider {s['reward_hider'].sum():.0f}"
+                  f" hunter {s['reward_hunter'].sum():.0f}")
+    else:
+        show_replay(log, args.episode, args.out, args.fps)
+
+if __name__ == "__main__":
+    main()
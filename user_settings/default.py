@@ -10,9 +10,16 @@ FPS = 60
 CORRIDOR_WIDTH = 4
 MAP_WIDTH = 25  # Odd number preferred
 MAP_HEIGHT = 25  # Odd number preferred
+MAP_GENERATOR = 'python'  # 'python' = original list-based backtracker, or NumPy 'backtracker' / 'kruskal'
+MAP_DISTANCE_FIELD = True  # Precompute wall clearance (sphere tracing, fast collision)
+MAP_VISIBILITY_TABLE = False  # Precompute cell-to-cell line of sight (Map.can_see)
+MAZE_POOL_FILE = None  # Maze pool file (maze_pool.py); HiderHunterEnv draws a new maze every episode
 
 # --- Visualization Scaling ---
 VIEW_SCALE = 28  # Pixels per map cell for rendering the map
+RENDER_CHUNK_CELLS = 16  # Map cells per side of a cached maze tile
+RENDER_CHUNK_CACHE_MB = 24  # Pixel memory for cached tiles before evicting the least recently drawn (~2-3 screens)
+RAY_FAN_POLYGON_MIN_RAYS = 360  # From this many rays the fan is drawn as one filled polygon
 
 # --- Player Settings ---
 PLAYER_FOV = math.radians(65)
@@ -23,7 +30,11 @@ PLAYER_RADIUS = 0.21  # relative to a map cell, for collision
 # --- Raycasting Settings ---
 NUM_RAYS = 45  # Number of rays within FOV
 RAY_MAX_DISTANCE = 16.0  # Cells
-RAY_STEP_SIZE = 0.02  # Cells
+RAY_STEP_SIZE = 0.02  # Cells (only used by the 'step' engine)
+# The shipped hider_dqn.pth / hunter_dqn.pth were trained on 'step' wall distances;
+# 'dda' and 'sphere' are faster but shift those observations, so use them for new training runs.
+RAY_ENGINE = 'step'  # 'step' = fixed-step marcher, 'dda' = exact cell traversal, 'sphere' = distance-field jumps
+OBJECT_VISIBILITY_CULLING = False  # Skip objects whose cell the viewer's cell cannot see (approximate)
 
 # --- Sprite/Object Settings ---
 SPRITE_RADIUS = 0.18  # Map cells
@@ -31,6 +42,7 @@ SPRITE_RADIUS = 0.18  # Map cells
 # --- NPC (Fake Player) Settings ---
 FAKE_PLAYER_SPEED = 2.0  # Cells per second
 FAKE_PLAYER_RADIUS = 0.19
+NUM_FAKE_PLAYERS = 1  # Wandering NPCs in main.py, moved together by kinematics.Wanderers
 
 # --- Colors ---
 COLOR_BG = (40, 40, 40)
@@ -46,6 +58,14 @@ COLOR_STATIC_SPRITE = (122, 255, 110)
 COLOR_FAKE_PLAYER = (246, 144, 255)
 COLOR_NPC_DIR = (200, 90, 200)
 
+# --- Training Settings ---
+TORCH_DEVICE = 'auto'  # 'auto' (cuda > mps > cpu), or any torch device string
+REPLAY_PRIORITIZED = False  # Prioritized experience replay (sum-tree) instead of uniform sampling
+PER_ALPHA = 0.6  # How strongly TD error shapes sampling (0 = uniform)
+PER_BETA_START = 0.4  # Importance-sampling correction, annealed to 1
+PER_BETA_STEPS = 20000  # Updates over which beta reaches 1
+TRAJECTORY_LOG_FILE = 'games.rctraj'  # play_as_ai.py / play_with_ai.py append every game here (trajectory_log.py); None disables
+
 # --- Font Settings ---
 FONT_NAME = "consolas"
 FONT_SIZE = 20
\ No newline at end of file
@@ -7,10 +7,19 @@ FPS = 180
 CORRIDOR_WIDTH = 4
 MAP_WIDTH = 17
 MAP_HEIGHT = 17
+MAP_GENERATOR = 'python'  # or 'backtracker' / 'kruskal' (NumPy)
+MAP_DISTANCE_FIELD = True
+MAP_VISIBILITY_TABLE = False
+MAZE_POOL_FILE = None  # e.g. 'mazes.bin' from maze_pool.py
 VIEW_SCALE = 32
+RENDER_CHUNK_CELLS = 16
+RENDER_CHUNK_CACHE_MB = 24
+RAY_FAN_POLYGON_MIN_RAYS = 360
 PLAYER_RADIUS = 0.18
 RAY_MAX_DISTANCE = 8.0
 RAY_STEP_SIZE = 0.03
+RAY_ENGINE = 'step'  # 'step', 'dda' or 'sphere'; shipped *_dqn.pth expect 'step'
+OBJECT_VISIBILITY_CULLING = False
 NUM_RAYS = 45
 
 # --- Colors ---
@@ -31,6 +40,7 @@ COLOR_NPC_DIR = (200, 90, 200)
 # --- NPC (Fake Player) Settings ---
 FAKE_PLAYER_SPEED = 2.0  # Cells per second
 FAKE_PLAYER_RADIUS = 0.19
+NUM_FAKE_PLAYERS = 1
 
 # --- Player Settings ---
 PLAYER_FOV = math.radians(65)
@@ -38,6 +48,14 @@ PLAYER_MOVE_SPEED = 3.0  # Cells per second
 PLAYER_ROT_SPEED = math.radians(120)  # Radians per second
 PLAYER_RADIUS = 0.21  # relative to a map cell, for collision
 
+# --- Training Settings ---
+TORCH_DEVICE = 'auto'  # cuda > mps > cpu
+REPLAY_PRIORITIZED = False
+PER_ALPHA = 0.6
+PER_BETA_START = 0.4
+PER_BETA_STEPS = 20000
+TRAJECTORY_LOG_FILE = 'games.rctraj'  # None disables
+
 # --- Font Settings ---
 FONT_NAME = "consolas"
 FONT_SIZE = 20
\ No newline at end of file
@@ -2,6 +2,8 @@
 
 import math
 
+SQRT2 = math.sqrt(2)
+
 def clamp(val, minval, maxval):
     return max(min(val, maxval), minval)
 
@@ -0,0 +1,127 @@
+# vec_env.py
+
+import math
+import numpy as np
+from settings import PLAYER_FOV, PLAYER_RADIUS, PLAYER_ROT_SPEED, RAY_MAX_DISTANCE
+from map import Map
+from raycaster import raycast_many, ray_circle_distance
+from ai_env import ACT_MAP, AGENT_MOVE_SPEED, MOVE_DT, TURN_DT, CATCH_FACTOR
+from kinematics import move_delta, try_move
+
+HIDER, HUNTER = 0, 1
+ACTIONS = np.array(ACT_MAP, dtype=np.float64)
+NEIGHBOR_OFFSETS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)])
+
+class VecHiderHunterEnv:
+    """
+    n_envs copies of ai_env.HiderHunterEnv stepped in lockstep with array
+    math. All envs share one maze. Agent state lives in arrays indexed
+    [env, agent] with agent 0 = hider, 1 = hunter. Finished envs are reset
+    automatically; step() also returns the pre-reset observations.
+    """
+    def __init__(self, n_envs, map_width=15, map_height=15, num_rays=15, max_steps=300,
+                 game_map=None, seed=None):
+        self.n_envs = n_envs
+        self.map = game_map if game_map is not None else Map(map_width, map_height)
+        self.num_rays = num_rays
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.radius = PLAYER_RADIUS
+        self.move_speed = AGENT_MOVE_SPEED
+        self.rot_speed = PLAYER_ROT_SPEED
+        self._free_cells = self.map.free_cells
+
+        self.pos = np.zeros((n_envs, 2, 2))    # [env, agent, (x, y)]
+        self.angle = np.zeros((n_envs, 2))
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+        self.obs_dim = 2 * num_rays + 6
+        self.reset()
+
+    def reset(self):
+        self._reset_envs(np.arange(self.n_envs))
+        return self._get_obs()
+
+    def _reset_envs(self, idx):
+        """Same spawn rule as HiderHunterEnv.reset_hunter, for the envs in idx."""
+        n = len(idx)
+        if n == 0:
+            return
+        hider_cells = self._free_cells[self.rng.integers(len(self._free_cells), size=n)]
+        # Hunter: first free cell among the 8 neighbours, in random order.
+        order = np.argsort(self.rng.random((n, len(NEIGHBOR_OFFSETS))), axis=1)
+        cand = hider_cells[:, None, :] + NEIGHBOR_OFFSETS[order]
+        free = ~self.map.is_wall_many(cand[..., 0] + 0.5, cand[..., 1] + 0.5)
+        first = np.argmax(free, axis=1)
+        hunter_cells = cand[np.arange(n), first]
+        # Fallback: any other free cell.
+        for i in np.flatnonzero(~free.any(axis=1)):
+            while True:
+                cell = self._free_cells[self.rng.integers(len(self._free_cells))]
+                if (cell != hider_cells[i]).any():
+                    hunter_cells[i] = cell
+                    break
+        self.pos[idx, HIDER] = hider_cells + 0.5
+        self.pos[idx, HUNTER] = hunter_cells + 0.5
+        self.angle[idx] = self.rng.uniform(0, 2 * math.pi, size=(n, 2))
+        self.steps[idx] = 0
+
+    def _apply_actions(self, actions):
+        fwd, strafe, rot = ACTIONS[actions].transpose(2, 0, 1)
+        dx, dy = move_delta(self.angle, fwd, strafe, self.move_speed, MOVE_DT)
+        self.pos[..., 0], self.pos[..., 1] = try_move(self.map, self.pos[..., 0], self.pos[..., 1],
+                                                      dx, dy, self.radius)
+        self.angle = (self.angle + self.rot_speed * rot * TURN_DT) % (2 * math.pi)
+
+    def step(self, actions_hider, actions_hunter):
+        """
+        actions_*: (n_envs,) ints indexing ai_env.ACT_MAP.
+        Returns (obs_hider, obs_hunter), (reward_hider, reward_hunter), done,
+        final_obs where final_obs = (obs_hider, obs_hunter) before auto-reset
+        (equal to the returned obs for envs that are not done).
+        """
+        actions = np.stack([np.asarray(actions_hider), np.asarray(actions_hunter)], axis=1)
+        self._apply_actions(actions)
+        self.steps += 1
+
+        delta = self.pos[:, HIDER] - self.pos[:, HUNTER]
+        caught = np.hypot(delta[:, 0], delta[:, 1]) < 2 * self.radius * CATCH_FACTOR
+        if self.max_steps == -1:
+            timeout = np.zeros(self.n_envs, dtype=bool)
+            survive_h, survive_t = 0.0, 0.0
+        else:
+            timeout = ~caught & (self.steps >= self.max_steps)
+            survive_h, survive_t = 1.0, -1.0
+        reward_hider = np.where(caught, -20.0, np.where(timeout, 5.0, survive_h))
+        reward_hunter = np.where(caught, 20.0, np.where(timeout, -2.0, survive_t))
+        done = caught | timeout
+
+        obs_hider, obs_hunter = self._get_obs()
+        final_obs = (obs_hider.copy(), obs_hunter.copy())
+        if done.any():
+            idx = np.flatnonzero(done)
+            self._reset_envs(idx)
+            new_hider, new_hunter = self._get_obs()
+            obs_hider[idx] = new_hider[idx]
+            obs_hunter[idx] = new_hunter[idx]
+        return (obs_hider, obs_hunter), (reward_hider, reward_hunter), done, final_obs
+
+    def _get_obs(self):
+        """(n_envs, obs_dim) observations for hiders and hunters, laid out as HiderHunterEnv._get_obs."""
+        n, r = self.n_envs, self.num_rays
+        poses = np.concatenate([self.pos.reshape(-1, 2), self.angle.reshape(-1, 1)], axis=1)
+        rays = raycast_many(poses, PLAYER_FOV, r, self.map)
+        wall = np.minimum(rays['distance'], RAY_MAX_DISTANCE) / RAY_MAX_DISTANCE
+
+        # Each viewer can only hit its opponent: viewer (env, agent) sees (env, 1 - agent).
+        other_pos = self.pos[:, ::-1].reshape(-1, 2)
+        offsets = -PLAYER_FOV / 2 + np.arange(r) * (PLAYER_FOV / max(r - 1, 1))
+        ray_a = poses[:, 2:3] + offsets
+        t = ray_circle_distance(poses[:, 0:1], poses[:, 1:2], np.cos(ray_a), np.sin(ray_a),
+                                other_pos[:, 0:1], other_pos[:, 1:2], self.radius, rays['distance'])
+        other = np.where(np.isinf(t), 1.0, np.minimum(t, RAY_MAX_DISTANCE) / RAY_MAX_DISTANCE)
+
+        cos_sin = np.stack([np.cos(self.angle), np.sin(self.angle)], axis=2)   # [env, agent, 2]
+        ang = np.concatenate([cos_sin, cos_sin[:, ::-1]], axis=2).reshape(-1, 4)
+        vel = np.zeros((2 * n, 2))   # Placeholder, as in HiderHunterEnv
+        obs = np.concatenate([wall, other, ang, vel], axis=1).reshape(n, 2, -1)
+        return obs[:, HIDER], obs[:, HUNTER]
@@ -0,0 +1,126 @@
+# visibility.py
+
+import math
+import numpy as np
+from settings import RAY_MAX_DISTANCE
+
+def line_cells(dx, dy):
+    """
+    Cells strictly between (0, 0) and (dx, dy) crossed by the segment joining
+    their centers, as relative (x, y) offsets. When the segment passes exactly
+    through a grid corner both cells touching it are included, so sight never
+    slips between two diagonal walls.
+    """
+    cells = []
+    ax, ay = abs(dx), abs(dy)
+    sx = 1 if dx > 0 else -1
+    sy = 1 if dy > 0 else -1
+    x = y = 0
+    # Boundary k is crossed at t = (2k - 1) / (2 * a); compare in integers.
+    kx = ky = 1
+    while kx <= ax or ky <= ay:
+        tx = (2 * kx - 1) * ay if kx <= ax else None
+        ty = (2 * ky - 1) * ax if ky <= ay else None
+        if ty is None or (tx is not None and tx < ty):
+            x += sx
+            kx += 1
+        elif tx is None or ty < tx:
+            y += sy
+            ky += 1
+        else:
+            cells.append((x + sx, y))
+            cells.append((x, y + sy))
+            x += sx
+            y += sy
+            kx += 1
+            ky += 1
+        if (x, y) != (dx, dy):
+            cells.append((x, y))
+    return cells
+
+class VisibilityTable:
+    """
+    Bit-packed cell-to-cell line of sight for a static map: row i holds one
+    bit per floor cell j, set when the centers of floor cells i and j are at
+    most max_range apart and the segment between them crosses no wall.
+    """
+    def __init__(self, walls, max_range=RAY_MAX_DISTANCE):
+        # walls: padded bool grid as in Map.walls
+        self.max_range = max_range
+        inner = walls[1:-1, 1:-1]
+        self.height, self.width = inner.shape
+        ys, xs = np.nonzero(~inner)
+        self.num_cells = len(xs)
+        # cell_ids[y, x] = floor cell index, -1 for walls
+        self.cell_ids = np.full(inner.shape, -1, dtype=np.int32)
+        self.cell_ids[ys, xs] = np.arange(self.num_cells, dtype=np.int32)
+        self.bits = np.zeros((self.num_cells, (self.num_cells + 7) // 8), dtype=np.uint8)
+
+        # Every source is a cell center, so the cells crossed towards each
+        # target offset are the same for all sources: walk them once.
+        reach = int(math.floor(max_range))
+        offsets = [(dx, dy) for dy in range(-reach, reach + 1) for dx in range(-reach, reach + 1)
+                   if 0 < dx*dx + dy*dy <= max_range*max_range]
+        off_x = np.array([dx for dx, dy in offsets], dtype=np.int64)
+        off_y = np.array([dy for dx, dy in offsets], dtype=np.int64)
+        path_x, path_y, starts = [], [], []
+        for dx, dy in offsets:
+            starts.append(len(path_x))
+            for cx, cy in line_cells(dx, dy):
+                path_x.append(cx)
+                path_y.append(cy)
+        path_x = np.array(path_x, dtype=np.int64)
+        path_y = np.array(path_y, dtype=np.int64)
+        starts = np.array(starts, dtype=np.int64)
+        # Adjacent offsets have empty paths; reduceat needs a sentinel entry.
+        empty = np.append(starts[1:], len(path_x)) == starts
+        path_x = np.append(path_x, 0)
+        path_y = np.append(path_y, 0)
+
+        row = np.zeros(self.num_cells, dtype=bool)
+        for i in range(self.num_cells):
+            sx, sy = xs[i], ys[i]
+            # Padded lookups: paths never leave the map by more than max_range.
+            px = np.clip(sx + 1 + path_x, 0, self.width + 1)
+            py = np.clip(sy + 1 + path_y, 0, self.height + 1)
+            blocked = np.logical_or.reduceat(walls[py, px], starts)
+            blocked[empty] = False
+            tx = sx + off_x
+            ty = sy + off_y
+            ok = ~blocked & (tx >= 0) & (ty >= 0) & (tx < self.width) & (ty < self.height)
+            targets = self.cell_ids[ty[ok], tx[ok]]
+            row[:] = False
+            row[targets[targets >= 0]] = True
+            row[i] = True
+            self.bits[i] = np.packbits(row)
+
+    def cell_id(self, x, y):
+        ix, iy = int(x), int(y)
+        if ix < 0 or iy < 0 or ix >= self.width or iy >= self.height:
+            return -1
+        return int(self.cell_ids[iy, ix])
+
+    def can_see(self, x0, y0, x1, y1):
+        """Table lookup: True if the cells containing both points see each other."""
+        a = self.cell_id(x0, y0)
+        b = self.cell_id(x1, y1)
+        if a < 0 or b < 0:
+            return False
+        return bool((self.bits[a, b >> 3] >> (7 - (b & 7))) & 1)
+
+    def visible_mask(self, x0, y0, xs, ys):
+        """Vectorized can_see from one point to arrays of points."""
+        a = self.cell_id(x0, y0)
+        xs = np.asarray(xs).astype(np.int64)
+        ys = np.asarray(ys).astype(np.int64)
+        inside = (xs >= 0) & (ys >= 0) & (xs < self.width) & (ys < self.height)
+        if a < 0:
+            return np.zeros(xs.shape, dtype=bool)
+        b = np.full(xs.shape, -1, dtype=np.int64)
+        b[inside] = self.cell_ids[ys[inside], xs[inside]]
+        bc = np.maximum(b, 0)
+        bits = (self.bits[a, bc >> 3] >> (7 - (bc & 7))) & 1
+        return (b >= 0) & (bits == 1)
+
+    def nbytes(self):
+        return self.bits.nbytes + self.cell_ids.nbytes